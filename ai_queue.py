@@ -0,0 +1,87 @@
+# 🐝 BeeBot AI queue — fair, bounded scheduling for OpenAI calls
+import asyncio
+from collections import OrderedDict, deque
+
+
+class HiveBusy(Exception):
+    """Raised when the AI backlog is full and a request has to be shed."""
+
+
+class FairAIQueue:
+    """Runs AI jobs with a global concurrency cap and per-guild round-robin.
+
+    Each guild (or DM) gets its own FIFO lane; workers take one job from each
+    lane in turn, so one busy server can't starve everyone else. Once
+    `max_backlog` jobs are waiting, new submissions raise `HiveBusy`.
+    """
+
+    def __init__(self, concurrency=4, max_backlog=50):
+        self.concurrency = max(1, concurrency)
+        self.max_backlog = max(0, max_backlog)
+        self._lanes = OrderedDict()  # lane key -> deque of (job factory, future)
+        self._waiting = 0
+        self._active = 0
+        self._wakeup = None
+        self._workers = []
+
+    @property
+    def waiting(self):
+        return self._waiting
+
+    @property
+    def active(self):
+        return self._active
+
+    def _ensure_workers(self):
+        # 🌼 Workers are started lazily so the queue can be built before the event loop runs
+        if self._workers:
+            return
+        self._wakeup = asyncio.Event()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def submit(self, lane, job):
+        """Queue `job` (a zero-argument coroutine function) in `lane` and await its result."""
+        self._ensure_workers()
+        if self._waiting >= self.max_backlog:
+            raise HiveBusy(f"AI backlog full ({self._waiting} waiting)")
+
+        future = asyncio.get_running_loop().create_future()
+        self._lanes.setdefault(lane, deque()).append((job, future))
+        self._waiting += 1
+        self._wakeup.set()
+        return await future
+
+    def _next_job(self):
+        # 🔄 Pop from the lane at the front, then rotate it to the back if it still has work
+        lane, jobs = next(iter(self._lanes.items()))
+        job, future = jobs.popleft()
+        del self._lanes[lane]
+        if jobs:
+            self._lanes[lane] = jobs
+        self._waiting -= 1
+        return job, future
+
+    async def _worker(self):
+        while True:
+            while not self._lanes:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            job, future = self._next_job()
+            if future.done():  # Caller gave up (e.g. cancelled) while queued
+                continue
+
+            self._active += 1
+            try:
+                result = await job()
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self._active -= 1
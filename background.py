@@ -0,0 +1,22 @@
+# 🧷 BeeBot background tasks — fire-and-forget coroutines that can't be garbage-collected mid-run
+import asyncio
+
+
+class TaskSet:
+    """Holds running tasks until they finish.
+
+    The event loop only keeps weak references to tasks, so a task nobody
+    references can disappear before it completes.
+    """
+
+    def __init__(self):
+        self._tasks = set()
+
+    def spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def __len__(self):
+        return len(self._tasks)
@@ -0,0 +1,69 @@
+# 📝 BeeBot logging — leveled stdlib logging with output written off the event loop
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+
+# Attributes every LogRecord has; anything else came in through `extra=` and goes into JSON output
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class BeeFormatter(logging.Formatter):
+    """The classic `🐝 [BeeBot Log] ...` line, with the level for anything above INFO."""
+
+    def format(self, record):
+        message = super().format(record)
+        level = "" if record.levelno == logging.INFO else f"{record.levelname} "
+        return f"🐝 [BeeBot Log] {level}{message}"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log ingestion."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_FIELDS})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SampleFilter(logging.Filter):
+    """Lets only a fraction of records marked `extra={"sampled": True}` through (e.g. full prompt dumps)."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if getattr(record, "sampled", False):
+            return random.random() < self.rate
+        return True
+
+
+def setup_logging(level="INFO", json_output=False, sample_rate=0.05):
+    """Route all logging through a queue; a background thread does the actual writing."""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter() if json_output else BeeFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(SampleFilter(sample_rate))  # Drop sampled records before they're queued
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,63 @@
+# ⏱️ Emotion detection micro-benchmark: compiled detector vs. the old nested keyword scan
+#   python benchmarks/bench_emotion.py
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from emotion import EMOTION_MAP, EmotionDetector  # noqa: E402
+
+
+def legacy_detect_emotion(message):
+    # The pre-compiled implementation: substring scan, first dict-order hit wins
+    text = message.lower()
+    for emotion, keywords in EMOTION_MAP.items():
+        if any(word in text for word in keywords):
+            return emotion
+    return "neutral"
+
+
+SAMPLES = [
+    "hey beebot, how are you today?",
+    "I ate a blueberry muffin while the download finished",
+    "honestly I'm fine, just a bit sad and burnt out from work",
+    "feeling on edge before my exam tomorrow, super nervous",
+    "what do bees eat in winter?",
+    "I'm so happy!! we got the puppy",
+    "nobody texted back, I feel ignored and left out",
+    "ugh, I'm annoyed that the bus was late again",
+]
+
+
+def make_messages(count, length, samples=SAMPLES):
+    words = " ".join(samples).split()
+    rng = random.Random(42)
+    return [" ".join(rng.choice(words) for _ in range(length)) for _ in range(count)]
+
+
+def bench(label, func, messages, repeat=5):
+    best = min(timeit.repeat(lambda: [func(m) for m in messages], number=1, repeat=repeat))
+    print(f"  {label:<10} {best / len(messages) * 1e6:8.2f} µs/message")
+
+
+def main():
+    detector = EmotionDetector()
+    print("Sample disagreements (legacy -> compiled):")
+    for message in SAMPLES:
+        old, new = legacy_detect_emotion(message), detector.detect(message).emotion
+        if old != new:
+            print(f"  {old:>8} -> {new:<8} {message!r}")
+
+    calm = ["what do bees eat in winter", "tell me a fact about the queen and her hive"]
+    for label, samples in (("mixed", SAMPLES), ("no keywords", calm)):
+        for length in (8, 40, 200):
+            messages = make_messages(2000, length, samples)
+            print(f"\n{len(messages)} {label} messages of {length} words:")
+            bench("legacy", legacy_detect_emotion, messages)
+            bench("compiled", detector.detect, messages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# 🧭 Emotion classifier benchmark: keyword detector vs. centroid classifier vs. both combined
+#   python benchmarks/bench_emotion_classifier.py      (needs NumPy)
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+
+from emotion import EmotionDetector  # noqa: E402
+from emotion_centroids import CentroidClassifier, available, load_examples  # noqa: E402
+
+# Held out: none of these are in emotion_examples.txt
+EVAL = [
+    ("sad", "my cat died yesterday and i can't stop crying"),
+    ("sad", "feeling really low since the funeral"),
+    ("sad", "i just feel so empty and grey today"),
+    ("sad", "it hurts that she moved away"),
+    ("sad", "nothing has felt good in weeks"),
+    ("sad", "i miss my old life so much"),
+    ("happy", "we won the match!!! so proud of the team"),
+    ("happy", "got an A on my exam, i'm grinning like an idiot"),
+    ("happy", "best birthday ever, thank you all"),
+    ("happy", "i finally got engaged!!"),
+    ("happy", "the sun is out and i'm loving life"),
+    ("happy", "so happy right now"),
+    ("angry", "my neighbour blasted music until 3am again, i'm livid"),
+    ("angry", "they charged me twice and won't refund, ridiculous"),
+    ("angry", "i'm so sick of being ignored in meetings by my boss"),
+    ("angry", "i want to scream at this stupid printer"),
+    ("angry", "how dare he say that about my mum"),
+    ("angry", "this is so frustrating"),
+    ("anxious", "job interview in an hour and my heart is pounding"),
+    ("anxious", "what if i fail and everyone finds out"),
+    ("anxious", "i can't stop shaking before my flight"),
+    ("anxious", "my chest is so tight i can't breathe right"),
+    ("anxious", "i keep overthinking every text i send"),
+    ("anxious", "so nervous about tomorrow"),
+    ("ashamed", "i can't believe i forgot my best friend's wedding"),
+    ("ashamed", "i snapped at my mum and feel horrible about it"),
+    ("ashamed", "everyone saw me trip on stage, i want to hide forever"),
+    ("ashamed", "it's my fault the project failed"),
+    ("ashamed", "i feel so guilty"),
+    ("rejected", "nobody wanted me on their team"),
+    ("rejected", "my friends made a group chat without me"),
+    ("rejected", "she hasn't replied in a week, guess i don't matter"),
+    ("rejected", "i always get left out of everything"),
+    ("rejected", "i feel so invisible at school"),
+    ("tired", "i've been awake for 20 hours straight"),
+    ("tired", "my eyes are closing on their own"),
+    ("tired", "night shift again, i'm running on fumes"),
+    ("tired", "i need about a week of sleep"),
+    ("tired", "so exhausted today"),
+    ("neutral", "what flowers do bees like best?"),
+    ("neutral", "can you remind me how the quiz works"),
+    ("neutral", "i had toast for breakfast"),
+    ("neutral", "how far can a bee fly"),
+    ("neutral", "hi beebot!"),
+    ("neutral", "is honey good for a cough"),
+]
+
+
+def combined(detector, classifier):
+    # What bot.py does: a keyword hit wins, the classifier fills in the rest
+    def detect(message):
+        keyword = detector.detect(message)
+        if keyword.scores and keyword.emotion != "neutral":
+            return keyword.emotion
+        return classifier.classify(message).emotion
+    return detect
+
+
+def accuracy(label, detect):
+    correct = sum(detect(message) == expected for expected, message in EVAL)
+    print(f"  {label:<10} {correct}/{len(EVAL)} = {correct / len(EVAL):.0%}")
+
+
+def throughput(label, func, messages, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(messages)
+        best = min(best, time.perf_counter() - started)
+    print(f"  {label:<22} {best / len(messages) * 1e6:8.1f} µs/message")
+
+
+def main():
+    if not available():
+        print("NumPy isn't installed; the centroid classifier is unavailable.")
+        return
+    detector = EmotionDetector()
+    classifier = CentroidClassifier(load_examples(os.path.join(ROOT, "emotion_examples.txt")), cache_size=0)
+
+    print(f"Accuracy on {len(EVAL)} held-out messages:")
+    accuracy("keywords", lambda message: detector.detect(message).emotion)
+    accuracy("centroid", lambda message: classifier.classify(message).emotion)
+    accuracy("combined", combined(detector, classifier))
+
+    messages = [message for _, message in EVAL] * 20
+    print("\nThroughput (cache off):")
+    throughput("keywords", lambda batch: [detector.detect(m) for m in batch], messages)
+    throughput("centroid, one by one", lambda batch: [classifier.classify(m) for m in batch], messages)
+    throughput("centroid, batches of 64",
+               lambda batch: [classifier.classify_many(batch[i:i + 64]) for i in range(0, len(batch), 64)], messages)
+
+
+if __name__ == "__main__":
+    main()
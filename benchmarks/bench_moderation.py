@@ -0,0 +1,58 @@
+# ⏱️ Banned-phrase benchmark: compiled PhraseFilter vs. the old per-phrase loop, by list size
+#   python benchmarks/bench_moderation.py
+import os
+import random
+import sys
+import timeit
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+
+from moderation import PhraseFilter  # noqa: E402
+
+
+def load_lines(filename):
+    with open(os.path.join(ROOT, filename), "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def legacy_is_banned(banned_phrases, prompt):
+    # The old ai_response loop: lowercase both sides for every phrase
+    for phrase in banned_phrases:
+        if phrase.lower() in prompt.lower():
+            return True
+    return False
+
+
+def synthetic_phrases(base, count, rng):
+    # Pad the real list with plausible-looking extra phrases up to `count`
+    words = " ".join(base).replace('"', "").replace("✖️", "").split()
+    extra = [f'✖️ "{" ".join(rng.choice(words) for _ in range(rng.randint(2, 6)))} {i}."' for i in range(count)]
+    return (base + extra)[:count]
+
+
+PROMPTS = [
+    "what do bees eat in winter?",
+    "I had a rough day and my friend told me I'm overreacting, is that fair?",
+    "can you tell me a joke about honey and pollen and the queen bee please, I need a laugh today",
+]
+
+
+def bench(label, func, prompts, repeat=5):
+    best = min(timeit.repeat(lambda: [func(p) for p in prompts], number=200, repeat=repeat))
+    print(f"  {label:<10} {best / (200 * len(prompts)) * 1e6:9.2f} µs/prompt")
+
+
+def main():
+    rng = random.Random(7)
+    base = load_lines("banned_phrases.txt")
+    for size in (len(base), 1_000, 10_000):
+        phrases = synthetic_phrases(base, size, rng)
+        compiled = PhraseFilter(phrases)
+        print(f"\n{size} banned phrases:")
+        bench("legacy", lambda p: legacy_is_banned(phrases, p), PROMPTS)
+        bench("compiled", lambda p: compiled.find(p) is not None, PROMPTS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# 🔎 Retrieval benchmark: how many everyday bee questions BeeBot answers without a model call, and how fast
+#   python benchmarks/bench_retrieval.py
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+
+from content import parse_lines, parse_quiz  # noqa: E402
+from retrieval import STOPWORDS, RetrievalIndex, build_snippets, direct_answer  # noqa: E402
+
+# (question, expected direct answer substring or None when BeeBot should ask the model)
+EVAL = [
+    ("how many wings does a bee have?", "Four"),
+    ("How many eyes do bees have?", "Five"),
+    ("how many legs does a bee have", "Six"),
+    ("what's the main role of a worker bee?", "Gathering nectar"),
+    ("where do bees store their honey?", "honeycombs"),
+    ("where do bees keep their honey?", None),  # No synonyms: "keep" never meets "store"
+    ("what is the queen bee's main job?", "Lay eggs"),
+    ("what do bees eat?", None),
+    ("what's the capital of france?", None),
+    ("how do i bake sourdough?", None),
+    ("can you write me a poem about summer?", None),
+    ("what is a western honeybee?", None),
+    ("is my code broken?", None),
+    ("how many eyes does a human have?", None),  # Same shape as a quiz question, different subject
+    ("How many legs do humans have?", None),
+    ("how many legs does a flower have?", None),
+]
+
+
+def read(filename):
+    with open(os.path.join(ROOT, filename), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def main(confidence=0.75, margin=1.5):
+    started = time.perf_counter()
+    index = RetrievalIndex(build_snippets(
+        parse_lines(read("facts.txt")), parse_lines(read("bee_species.txt")), parse_quiz(read("quiz.txt"))
+    ))
+    print(f"Indexed {len(index.snippets)} snippets, {len(index.postings)} terms in "
+          f"{(time.perf_counter() - started) * 1000:.1f} ms")
+
+    correct = answered = 0
+    for question, expected in EVAL:
+        hits = index.search(question)
+        direct = direct_answer(question, hits, confidence, margin)
+        answered += direct is not None
+        ok = (direct is None) if expected is None else (direct is not None and expected in direct)
+        correct += ok
+        print(f"  {'✓' if ok else '✗'} {question!r:45} -> {direct or '(model)'}")
+    print(f"{answered}/{len(EVAL)} answered locally, {correct}/{len(EVAL)} as expected")
+
+    # Every quiz question about "a bee", asked about each other word we know (and it doesn't mention):
+    # none may get the bee answer
+    swapped = [
+        (snippet.text.split("?")[0].replace(" bee ", f" {word} ") + "?", snippet.answer)
+        for snippet, vocabulary in zip(index.snippets, index.vocabularies)
+        if snippet.source == "quiz" and " bee " in snippet.text
+        for word in index.postings if word not in vocabulary and word not in STOPWORDS
+    ]
+    wrong = [
+        question for question, bee_answer in swapped
+        if direct_answer(question, index.search(question), confidence, margin) == bee_answer
+    ]
+    print(f"{len(wrong)}/{len(swapped)} questions about another subject got the bee answer" +
+          "".join(f"\n  ✗ {question}" for question in wrong[:10]))
+
+    rounds = 2000
+    started = time.perf_counter()
+    for i in range(rounds):
+        index.search(EVAL[i % len(EVAL)][0])
+    print(f"{(time.perf_counter() - started) / rounds * 1e6:.1f} µs per search")
+
+
+if __name__ == "__main__":
+    main()
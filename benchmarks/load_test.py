@@ -0,0 +1,360 @@
+# 🏋️ Load test: drive on_message, /ask and content commands with synthetic traffic — no Discord, no OpenAI
+#   python benchmarks/load_test.py --messages 2000 --rate 100 --openai-latency 0.4 --openai-errors 0.02
+#
+# A local fake OpenAI server answers chat completions (streamed or not) with configurable latency,
+# jitter and error rate. Redis is fakeredis unless --redis-url points at a real (scratch!) server.
+# Reports messages/sec, end-to-end and per-stage latency percentiles, and event-loop lag.
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+from aiohttp import web
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # bot.py loads its text files by relative path
+
+WORDS = (
+    "bees honey hive pollen flower sad tired happy today friend work garden queen nectar wings "
+    "why how what feel think help anxious excited waggle dance summer rain buzz"
+).split()
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def sentence(rng, low=4, high=18):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high))) + rng.choice("?!.")
+
+
+# 🤖 Fake OpenAI: /v1/chat/completions with latency, jitter, errors and SSE streaming
+class FakeOpenAI:
+    def __init__(self, latency, jitter, error_rate, tokens, rng):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.tokens = tokens
+        self.rng = rng
+        self.requests = 0
+        self.errors = 0
+        self.prefixes = set()  # Leading system messages seen so far, to mimic OpenAI's prefix cache
+
+    async def completions(self, request):
+        body = await request.json()
+        self.requests += 1
+        await asyncio.sleep(max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter)))
+        if self.rng.random() < self.error_rate:
+            self.errors += 1
+            status = self.rng.choice((429, 500, 503))
+            return web.json_response(
+                {"error": {"message": "fake failure", "type": "server_error"}},
+                status=status,
+                headers={"Retry-After": "0"} if status == 429 else None,
+            )
+
+        words = [self.rng.choice(WORDS) for _ in range(self.tokens)]
+        created = int(time.time())
+        prompt_tokens = sum(len(message["content"]) for message in body["messages"]) // 4
+        prefix = body["messages"][0]["content"]
+        cached = (len(prefix) // 4) // 128 * 128 if prefix in self.prefixes and len(prefix) >= 4096 else 0
+        self.prefixes.add(prefix)
+        usage = {
+            "prompt_tokens": prompt_tokens, "completion_tokens": self.tokens,
+            "total_tokens": prompt_tokens + self.tokens, "prompt_tokens_details": {"cached_tokens": cached},
+        }
+        if not body.get("stream"):
+            return web.json_response({
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": created, "model": body["model"],
+                "choices": [{
+                    "index": 0, "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": "🐝 " + " ".join(words)},
+                }],
+                "usage": usage,
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+
+        async def event(choices, extra=None):
+            chunk = {
+                "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": created,
+                "model": body["model"], "choices": choices, **(extra or {}),
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+
+        for index, word in enumerate(words):
+            await event([{"index": 0, "delta": {"content": ("🐝 " if not index else " ") + word}, "finish_reason": None}])
+            await asyncio.sleep(0.005)  # ~200 tokens/s
+        await event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if (body.get("stream_options") or {}).get("include_usage"):
+            await event([], {"usage": usage})
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self.completions)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        return runner, site._server.sockets[0].getsockname()[1]
+
+
+# 🎭 Just enough of discord.py's objects for BeeBot's handlers
+class FakeMessage:
+    def __init__(self, channel, content):
+        self.channel = channel
+        self.content = content
+
+    async def edit(self, content=None, **kwargs):
+        self.content = content
+        self.channel.edits += 1
+
+    async def add_reaction(self, emoji):
+        self.channel.reactions += 1
+
+
+class FakeChannel:
+    def __init__(self, channel_id, name):
+        self.id = channel_id
+        self.name = name
+        self.sent = 0
+        self.edits = 0
+        self.reactions = 0
+        self.pending = []  # perf_counter() of messages still waiting for a reply
+
+    async def send(self, content=None, **kwargs):
+        self.sent += 1
+        return FakeMessage(self, content)
+
+
+class FakeUser:
+    def __init__(self, user_id):
+        self.id = user_id
+        self.bot = False
+        self.name = f"bee{user_id}"
+        self.mention = f"<@{user_id}>"
+
+    def __str__(self):
+        return self.name
+
+
+class FakeGuild:
+    def __init__(self, guild_id):
+        self.id = guild_id
+        self.name = f"guild{guild_id}"
+        self.shard_id = 0
+
+
+class FakeIncoming(FakeMessage):
+    def __init__(self, author, channel, guild, content):
+        super().__init__(channel, content)
+        self.author = author
+        self.guild = guild
+
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def defer(self, **kwargs):
+        pass
+
+    async def send_message(self, content=None, **kwargs):
+        self.interaction.message = await self.interaction.channel.send(content)
+
+
+class FakeFollowup:
+    def __init__(self, channel):
+        self.channel = channel
+
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content)
+
+
+class FakeInteraction:
+    def __init__(self, user, channel, guild):
+        self.user = user
+        self.channel = channel
+        self.channel_id = channel.id
+        self.guild = guild
+        self.guild_id = guild.id
+        self.application_id = 1
+        self.token = "fake"
+        self.message = None
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(channel)
+
+    async def original_response(self):
+        return self.message
+
+
+async def watch_loop_lag(samples, interval=0.01):
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - started - interval)
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    fake_openai = FakeOpenAI(args.openai_latency, args.openai_jitter, args.openai_errors, args.reply_tokens, rng)
+    runner, port = await fake_openai.start()
+
+    # 🔧 Configure BeeBot before importing it; everything it talks to is local
+    os.environ.update({
+        "OPENAI_API_KEY": "fake",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{port}/v1",
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "ERROR"),
+        "AI_MAX_CONCURRENCY": str(args.ai_concurrency),
+        "STREAM_REPLIES": "on" if args.stream else "off",
+        "QUIZ_ROUND_SECONDS": "1",
+    })
+    if not args.rate_limits:
+        os.environ.update({"RATE_LIMIT_USER": "", "RATE_LIMIT_CHANNEL": "", "RATE_LIMIT_GUILD": ""})
+
+    import redis.asyncio as aioredis
+    import storage
+    if args.redis_url:
+        storage.create_redis = lambda **kwargs: aioredis.from_url(args.redis_url, decode_responses=True)
+    else:
+        import fakeredis.aioredis
+        storage.create_redis = lambda **kwargs: fakeredis.aioredis.FakeRedis(decode_responses=True, max_connections=10_000)
+
+    import bot as beebot
+
+    # ⏱️ End-to-end latency: from on_message until its (possibly coalesced) reply is fully delivered
+    e2e = []
+    send_ai_reply = beebot.send_ai_reply
+
+    async def timed_send_ai_reply(send, prompt, **kwargs):
+        reply = await send_ai_reply(send, prompt, **kwargs)
+        channel = getattr(send, "__self__", None)
+        if isinstance(channel, FakeChannel):
+            done = time.perf_counter()
+            e2e.extend(done - started for started in channel.pending)
+            channel.pending.clear()
+        return reply
+
+    beebot.send_ai_reply = timed_send_ai_reply
+
+    guilds = [FakeGuild(1000 + index) for index in range(args.guilds)]
+    users = [FakeUser(10_000 + index) for index in range(args.users)]
+    channels = {user.id: FakeChannel(50_000 + user.id, f"chat-{user.id}") for user in users}
+    homes = {user.id: rng.choice(guilds) for user in users}
+    for user in users:
+        await beebot.r.set(f"consent:{user.id}", "on")
+        await beebot.r.set(f"autoreply:{channels[user.id].id}", "on")
+
+    await beebot.gatekeeper.load()
+    listener = asyncio.create_task(beebot.settings.listen())
+    lag = []
+    lag_watch = asyncio.create_task(watch_loop_lag(lag))
+    ask_latency = []
+    command_latency = []
+
+    async def ask(user):
+        started = time.perf_counter()
+        interaction = FakeInteraction(user, channels[user.id], homes[user.id])
+        await beebot.ask.callback(interaction, sentence(rng))
+        ask_latency.append(time.perf_counter() - started)
+
+    async def command(user):
+        started = time.perf_counter()
+        interaction = FakeInteraction(user, channels[user.id], homes[user.id])
+        handler = rng.choice((beebot.bee_fact, beebot.bee_joke, beebot.bee_question, beebot.bee_quiz))
+        await handler.callback(interaction)
+        command_latency.append(time.perf_counter() - started)
+
+    print(f"Sending {args.messages} events at ~{args.rate}/s from {args.users} users in {args.guilds} guilds...")
+    tasks = []
+    started = time.perf_counter()
+    for _ in range(args.messages):
+        user = rng.choice(users)
+        roll = rng.random()
+        if roll < args.ask_share:
+            tasks.append(asyncio.create_task(ask(user)))
+        elif roll < args.ask_share + args.command_share:
+            tasks.append(asyncio.create_task(command(user)))
+        else:
+            channel = channels[user.id]
+            channel.pending.append(time.perf_counter())
+            handled = time.perf_counter()
+            await beebot.on_message(FakeIncoming(user, channel, homes[user.id], sentence(rng)))
+            beebot.metrics.observe("stage_seconds", time.perf_counter() - handled, stage="on_message")
+        await asyncio.sleep(rng.expovariate(args.rate))
+    sent_for = time.perf_counter() - started
+
+    # Let coalesced bursts and in-flight replies finish
+    await asyncio.gather(*tasks)
+    deadline = time.perf_counter() + args.drain
+    while any(channel.pending for channel in channels.values()) and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    lag_watch.cancel()
+    listener.cancel()
+    await runner.cleanup()
+
+    def row(label, values):
+        ms = [value * 1000 for value in values]
+        print(f"  {label:<26} {len(ms):>6} {percentile(ms, 0.5):>9.1f} {percentile(ms, 0.95):>9.1f} "
+              f"{percentile(ms, 0.99):>9.1f} {max(ms, default=0):>9.1f}")
+
+    print(f"\nOffered {args.messages / sent_for:.1f} events/s; all replies done after {elapsed:.1f}s "
+          f"({args.messages / elapsed:.1f} events/s end to end)")
+    print(f"Fake OpenAI: {fake_openai.requests} requests, {fake_openai.errors} injected errors")
+    outcomes = {dict(labels)["outcome"]: value
+                for (name, labels), value in beebot.metrics.counters.items() if name == "replies_total"}
+    print(f"Reply outcomes: {outcomes}")
+    tokens = {kind: beebot.metrics.counter_value("openai_tokens_total", kind=kind)
+              for kind in ("prompt", "cached", "completion")}
+    print(f"Tokens: {tokens['prompt']} prompt ({tokens['cached']} served from the prefix cache), "
+          f"{tokens['completion']} completion")
+    unanswered = sum(len(channel.pending) for channel in channels.values())
+    if unanswered:
+        print(f"⚠️ {unanswered} messages still unanswered after a {args.drain}s drain")
+
+    print(f"\n  {'latency (ms)':<26} {'count':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    row("on_message → reply", e2e)
+    row("/ask", ask_latency)
+    row("content commands", command_latency)
+    row("event-loop lag", lag)
+    for (name, labels), histogram in sorted(beebot.metrics.histograms.items()):
+        if name == "stage_seconds":
+            stage = dict(labels)["stage"]
+            p50, p95, p99 = (histogram.quantile(q) * 1000 for q in (0.5, 0.95, 0.99))
+            print(f"  stage:{stage:<20} {histogram.count:>6} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f} {'':>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=1000, help="total events to send")
+    parser.add_argument("--rate", type=float, default=100, help="average events per second (Poisson arrivals)")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--guilds", type=int, default=10)
+    parser.add_argument("--ask-share", type=float, default=0.1, help="fraction of events that are /ask")
+    parser.add_argument("--command-share", type=float, default=0.1, help="fraction that are /bee_fact etc.")
+    parser.add_argument("--openai-latency", type=float, default=0.3, help="seconds before the fake answers")
+    parser.add_argument("--openai-jitter", type=float, default=0.1)
+    parser.add_argument("--openai-errors", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--reply-tokens", type=int, default=40)
+    parser.add_argument("--ai-concurrency", type=int, default=int(os.getenv("AI_MAX_CONCURRENCY", 4)))
+    parser.add_argument("--no-stream", dest="stream", action="store_false", help="disable streamed replies")
+    parser.add_argument("--rate-limits", action="store_true", help="keep the default auto-reply rate limits")
+    parser.add_argument("--redis-url", help="use this Redis instead of fakeredis (it gets written to!)")
+    parser.add_argument("--drain", type=float, default=30, help="seconds to wait for outstanding replies")
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
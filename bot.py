@@ -2,7 +2,8 @@
 import discord
 from discord.ext import commands, tasks
 from discord import Interaction, app_commands
-from openai import OpenAI
+import openai
+from openai import AsyncOpenAI
 import os
 import redis
 import random
@@ -10,63 +11,232 @@ from dotenv import load_dotenv
 from datetime import datetime, timedelta, timezone  # ✅ Fixed timestamp handling
 import asyncio
 import re
+import logging
+import hashlib
+import json
+import math
+import socket
+import time
+from collections import Counter
+from bee_logging import setup_logging
+from background import TaskSet
+from ai_queue import FairAIQueue, HiveBusy
+from storage import HiveStore, MessageSnapshot, create_redis, serious_mode_key
+from personas import PersonaRegistry
+from emotion import EmotionDetector
+from emotion_centroids import CentroidClassifier, EmotionBatcher, load_examples
+import emotion_centroids
+from moderation import PhraseFilter
+from response_cache import ResponseCache
+from streaming import StreamingReply, split_message
+from throttle import MessageCoalescer, RateLimiter, parse_rate
+from metrics import Metrics
+from reminders import ReminderStore, parse_when
+from sharding import LeaderLease, ShardHealth, parse_shard_ids
+from jobs import JobQueue
+from settings import SettingsCache
+from gatekeeper import Gatekeeper
+from broadcast import Broadcaster
+from content import ContentStore
+from quiz import QuizEngine
+from retrieval import KnowledgeBase, direct_answer
+from prompts import PromptBuilder
+from resilience import CircuitOpen, ModelCascade
+from context_window import ContextSummarizer, count_tokens, decode_turn, encode_turn, fit_to_budget, render_context
 
 ANNOUNCEMENT_ROLE_NAME = "Bee Announcer"
 
 # 🧪 Load environment variables
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+# 📊 Metrics: stage latencies, token usage and queue depths (METRICS_PORT enables the /metrics endpoint)
+metrics = Metrics()
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", 0))
+
+# 🚀 Startup: version notes go out once per deploy, a few channels at a time
+ANNOUNCE_CONCURRENCY = int(os.getenv("ANNOUNCE_CONCURRENCY", 5))
+DEPLOY_ID = os.getenv("DEPLOY_ID") or os.getenv("RAILWAY_DEPLOYMENT_ID")
+# 📣 Broadcasts (version notes, /broadcast) are sent by one leader, BROADCAST_RATE messages/s at most
+# (Discord's global limit is 50/s per bot, and replies need some of it)
+BROADCAST_RATE = float(os.getenv("BROADCAST_RATE", 40))
+BROADCAST_POLL_SECONDS = float(os.getenv("BROADCAST_POLL_SECONDS", 2))
+
+# 🧩 Sharding: every process runs an AutoShardedBot. Leave SHARD_COUNT/SHARD_IDS unset to let
+# Discord pick the count; to split shards across processes give each one SHARD_COUNT (the total)
+# and its own SHARD_IDS range, e.g. "0-3" and "4-7".
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", 0)) or None
+SHARD_IDS = parse_shard_ids(os.getenv("SHARD_IDS", ""))
+if SHARD_IDS and not SHARD_COUNT:
+    raise SystemExit("SHARD_IDS needs SHARD_COUNT (the total number of shards across all processes)")
+CLUSTER_NAME = os.getenv("CLUSTER_NAME") or (f"shards-{SHARD_IDS[0]}-{SHARD_IDS[-1]}" if SHARD_IDS else "all")
+INSTANCE_ID = f"{CLUSTER_NAME}:{socket.gethostname()}:{os.getpid()}"
+SHARD_HEALTH_INTERVAL = float(os.getenv("SHARD_HEALTH_INTERVAL", 30))
+
+# 📅 Reminders: one dispatcher loop claims due reminders in batches (safe across replicas)
+REMINDER_POLL_SECONDS = float(os.getenv("REMINDER_POLL_SECONDS", 5))
+REMINDER_BATCH = int(os.getenv("REMINDER_BATCH", 200))
+REMINDER_MAX_PER_USER = int(os.getenv("REMINDER_MAX_PER_USER", 25))
+REMINDER_MAX_LENGTH = int(os.getenv("REMINDER_MAX_LENGTH", 1500))  # Leaves room for the prefix in a 2000-char message
+REMINDER_MAX_ATTEMPTS = int(os.getenv("REMINDER_MAX_ATTEMPTS", 5))
+
+# 📝 Leveled logging, written off the event loop (LOG_LEVEL, LOG_FORMAT=text|json).
+# Full prompt/reply dumps are DEBUG and only LOG_SAMPLE_RATE of them are kept.
+setup_logging(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    json_output=os.getenv("LOG_FORMAT", "text") == "json",
+    sample_rate=float(os.getenv("LOG_SAMPLE_RATE", 0.05))
+)
+log = logging.getLogger("beebot")
+
+# 🧷 Fire-and-forget tasks are kept here until done
+background_tasks = TaskSet()
+spawn = background_tasks.spawn
+
+# 🛟 OpenAI calls: our own deadlines, jittered retries (honouring Retry-After) and per-model circuit
+# breakers, so the SDK's built-in retries are off. OPENAI_MODELS is the fallback order; short,
+# neutral messages start at OPENAI_FAST_MODEL instead.
+client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+OPENAI_MODELS = [model.strip() for model in os.getenv("OPENAI_MODELS", "gpt-4o,gpt-4o-mini").split(",") if model.strip()]
+OPENAI_FAST_MODEL = os.getenv("OPENAI_FAST_MODEL", "gpt-4o-mini")
+FAST_MODEL_MAX_TOKENS = int(os.getenv("FAST_MODEL_MAX_TOKENS", 24))
+openai_cascade = ModelCascade(
+    OPENAI_MODELS,
+    timeout=float(os.getenv("OPENAI_TIMEOUT", 30)),
+    deadline=float(os.getenv("OPENAI_DEADLINE", 60)),
+    max_retries=int(os.getenv("OPENAI_MAX_RETRIES", 2)),
+    failure_threshold=int(os.getenv("OPENAI_BREAKER_THRESHOLD", 5)),
+    reset_after=float(os.getenv("OPENAI_BREAKER_RESET", 30))
+)
+metrics.gauge("openai_open_circuits", lambda: openai_cascade.open_circuits)
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 
+# 🚦 AI concurrency: how many completions run at once, and how many may wait in line
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", 4))
+AI_MAX_BACKLOG = int(os.getenv("AI_MAX_BACKLOG", 50))
+BUSY_REPLY = "🐝 The hive is extra buzzy right now! Give me a moment and try again soon. 💛"
+ai_queue = FairAIQueue(concurrency=AI_MAX_CONCURRENCY, max_backlog=AI_MAX_BACKLOG)
+metrics.gauge("ai_queue_waiting", lambda: ai_queue.waiting)
+metrics.gauge("ai_queue_active", lambda: ai_queue.active)
+
+# ✍️ Streaming: post a placeholder at once and edit it as tokens arrive (edits coalesced)
+STREAM_REPLIES = os.getenv("STREAM_REPLIES", "on") == "on"
+STREAM_EDIT_INTERVAL = float(os.getenv("STREAM_EDIT_INTERVAL", 1.2))
+
 # 🛡️ Redis setup with graceful failure handling
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 REDIS_DB = int(os.getenv("REDIS_DB", 0))
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", None)
-
-try:
-    r = redis.Redis(
-        host=REDIS_HOST,
-        port=REDIS_PORT,
-        db=REDIS_DB,
-        password=REDIS_PASSWORD,
-        decode_responses=True
-    )
-    r.ping()  # ✅ Ensures Redis is reachable before bot starts
-except redis.ConnectionError:
-    print("❌ Redis connection failed. Please verify your credentials and server status.")
-    exit(1)
-
-# 📝 BeeBot-style logging
-def bee_log(message):
-    print(f"🐝 [BeeBot Log] {message}")
-
-# 🧠 Emotion detection using keyword mapping
-EMOTION_MAP = {
-    "sad": ["sad", "upset", "cry", "lonely", "depressed", "blue", "down", "hurt", "heartbroken",
-            "grieving", "mourning", "bummed", "melancholy", "despair"],
-    "happy": ["happy", "joy", "excited", "smile", "glad", "cheerful", "grateful", "content", "glee",
-              "thrilled", "blissful"],
-    "angry": ["angry", "mad", "furious", "annoyed", "frustrated", "irritated", "resentful",
-              "fuming", "snappy", "rage"],
-    "anxious": ["worried", "anxious", "scared", "nervous", "panicked", "overwhelmed", "afraid",
-                "tense", "shaky", "on edge", "dizzy", "racing", "uneasy"],
-    "ashamed": ["ashamed", "guilty", "embarrassed", "regret", "sorry", "disgusted with myself",
-                "worthless", "cringe", "mortified"],
-    "rejected": ["ignored", "unwanted", "rejected", "abandoned", "invisible", "left out", "unloved",
-                 "uncared for", "dismissed", "neglected"],
-    "tired": ["tired", "exhausted", "worn out", "drained", "burnt out", "sleepy", "drowsy",
-              "sluggish", "fatigued"],
-    "neutral": ["fine", "okay", "meh", "whatever", "shrug", "idk", "neutral"]
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 32))
+
+# 🍯 Async Redis client (pooled) — reachability is checked in setup_hook before the bot connects
+r = create_redis(
+    host=REDIS_HOST,
+    port=REDIS_PORT,
+    db=REDIS_DB,
+    password=REDIS_PASSWORD,
+    max_connections=REDIS_MAX_CONNECTIONS
+)
+# 🧵 Conversation memory: up to CONTEXT_MAX_TURNS turns kept, CONTEXT_TOKEN_BUDGET tokens sent;
+# older turns get folded into a rolling summary by SUMMARY_MODEL in the background
+CONTEXT_MAX_TURNS = int(os.getenv("CONTEXT_MAX_TURNS", 40))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 600))
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "gpt-4o-mini")
+store = HiveStore(r, context_limit=CONTEXT_MAX_TURNS)
+
+# 💾 Reply cache for context-free prompts (e.g. /ask): in-process LRU in front of Redis
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "on") == "on"
+response_cache = ResponseCache(
+    r,
+    ttl=int(os.getenv("RESPONSE_CACHE_TTL", 86400)),
+    max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 5000)),
+    l1_size=int(os.getenv("RESPONSE_CACHE_L1_SIZE", 256))
+)
+metrics.gauge("response_cache_hit_ratio", lambda: response_cache.hit_rate)
+reminder_store = ReminderStore(r, max_per_user=REMINDER_MAX_PER_USER, max_attempts=REMINDER_MAX_ATTEMPTS)
+
+# ⚙️ Consent, autoreply, serious mode and channel settings are served from memory;
+# writers publish the key on settings:invalidate so every replica drops its copy
+settings = SettingsCache(
+    r,
+    max_entries=int(os.getenv("SETTINGS_CACHE_SIZE", 50000)),
+    ttl=float(os.getenv("SETTINGS_CACHE_TTL", 300)),
+    on_error=lambda e: log.warning("Settings invalidation feed lost, resubscribing: %s", e)
+)
+metrics.gauge(
+    "settings_cache_hit_ratio",
+    lambda: settings.stats["hits"] / max(1, settings.stats["hits"] + settings.stats["misses"])
+)
+
+# 🚪 Early reject: a message outside autoreply channels, or from someone who never consented, costs a
+# couple of in-memory lookups; the /consent reminder goes out at most once per CONSENT_NAG_COOLDOWN
+gatekeeper = Gatekeeper(
+    r,
+    consent_capacity=int(os.getenv("CONSENT_FILTER_CAPACITY", 1000000)),
+    nag_cooldown=int(os.getenv("CONSENT_NAG_COOLDOWN", 86400)),
+    on_error=lambda e: log.warning("Couldn't refresh gatekeeper state: %s", e)
+)
+settings.watchers.append(gatekeeper.changed)
+
+# 📬 AI_WORKERS=on: the gateway only queues replies on a Redis Stream and `worker.py` processes answer them
+AI_WORKERS = os.getenv("AI_WORKERS", "off") == "on"
+job_queue = JobQueue(
+    r,
+    max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", 3)),
+    claim_idle=float(os.getenv("JOB_CLAIM_IDLE", 120))
+)
+# Only the lease holder polls for reminders; another process takes over if it goes away
+reminder_leader = LeaderLease(r, "leader:reminders", INSTANCE_ID, ttl=max(30, REMINDER_POLL_SECONDS * 3))
+shard_health = ShardHealth(r, CLUSTER_NAME, ttl=SHARD_HEALTH_INTERVAL * 3)
+broadcast_leader = LeaderLease(r, "leader:broadcasts", INSTANCE_ID, ttl=max(30, BROADCAST_POLL_SECONDS * 3))
+broadcaster = Broadcaster(
+    r,
+    rate=BROADCAST_RATE,
+    concurrency=ANNOUNCE_CONCURRENCY,
+    max_attempts=int(os.getenv("BROADCAST_MAX_ATTEMPTS", 5))
+)
+
+# 🚦 Auto-reply throttling: token buckets per user/channel/guild ("count/seconds", blank disables)
+RATE_LIMITS = {
+    scope: parse_rate(spec)
+    for scope, spec in {
+        "user": os.getenv("RATE_LIMIT_USER", "6/60"),
+        "channel": os.getenv("RATE_LIMIT_CHANNEL", "20/60"),
+        "guild": os.getenv("RATE_LIMIT_GUILD", "60/60"),
+    }.items()
+    if spec
 }
+rate_limiter = RateLimiter(r, RATE_LIMITS)
+COALESCE_WINDOW = float(os.getenv("COALESCE_WINDOW", 2.0))
+COALESCE_MAX_WAIT = float(os.getenv("COALESCE_MAX_WAIT", 8.0))
+
+# 🧠 Emotion detection: one compiled, weighted pass over EMOTION_MAP (see emotion.py)
+emotion_detector = EmotionDetector()
+
+# 🧭 EMOTION_CLASSIFIER=centroid: messages the keywords miss go to a local embedding classifier
+# (NumPy, examples in emotion_examples.txt), batched over EMOTION_BATCH_WINDOW seconds
+EMOTION_CLASSIFIER = os.getenv("EMOTION_CLASSIFIER", "keywords")
+emotion_batcher = None
+if EMOTION_CLASSIFIER == "centroid":
+    if emotion_centroids.available():
+        emotion_batcher = EmotionBatcher(
+            CentroidClassifier(
+                load_examples("emotion_examples.txt"),
+                min_similarity=float(os.getenv("EMOTION_MIN_SIMILARITY", 0.12))
+            ),
+            window=float(os.getenv("EMOTION_BATCH_WINDOW", 0.005))
+        )
+    else:
+        log.warning("EMOTION_CLASSIFIER=centroid needs NumPy; falling back to keywords")
 
-def detect_emotion(message):
-    text = message.lower()
-    for emotion, keywords in EMOTION_MAP.items():
-        if any(word in text for word in keywords):
-            bee_log(f"Detected emotion: {emotion} from message: '{message}'")
-            return emotion
-    return "neutral"
+async def detect_emotion(message):
+    result = emotion_detector.detect(message)
+    if emotion_batcher and (not result.scores or result.emotion == "neutral"):
+        result = await emotion_batcher.classify(message)
+    if result.scores:
+        log.debug("Detected emotion: %s (%.0f%%) from message: '%s'", result.emotion, result.confidence * 100, message)
+    return result.emotion
 
 # 🧬 Ritual tone selector
 def choose_response_style(emotion):
@@ -116,28 +286,63 @@ TONE_RITUALS = {
         "📎 I’m here. Say anything, and I’ll follow your lead."
     ]
 }
+prompt_builder = PromptBuilder(TONE_RITUALS)  # 🧱 Persona + house rules + tone guide: the cacheable prefix
+
 # 🐝 Intents configuration (includes message_content intent—make sure BeeBot is verified if needed)
-intents = discord.Intents.default()
-intents.messages = True
+# Only what BeeBot handles: no typing, presence, reaction, voice or member events to receive and drop
+intents = discord.Intents.none()
 intents.guilds = True
+intents.guild_messages = True
+intents.dm_messages = True
 intents.message_content = True  # ✅ Required for reading non-slash messages
 
 # 🐝 Bot Initialization
-class BeeBot(commands.Bot):
+class BeeBot(commands.AutoShardedBot):
+    version_announced = False  # on_ready fires on every reconnect; announce once per process
+
     async def setup_hook(self):
-        await self.tree.sync()  # ✅ Ensures all slash commands are globally registered
+        try:
+            await r.ping()  # ✅ Ensures Redis is reachable before bot starts
+        except redis.ConnectionError:
+            log.critical("❌ Redis connection failed. Please verify your credentials and server status.")
+            raise SystemExit(1)
+        log.info("Gatekeeper loaded %d autoreply channel setting(s)", await gatekeeper.load())
+        self.settings_listener = asyncio.create_task(settings.listen())
+        log.info("Loaded %d guild persona override(s)", await load_persona_overrides())
+        if METRICS_PORT:
+            await metrics.serve(METRICS_HOST, METRICS_PORT)
+            log.info("Serving metrics on http://%s:%d/metrics", METRICS_HOST, METRICS_PORT)
+        dispatch_reminders.start()
+        deliver_broadcasts.start()
+        report_shard_health.start()
+        # Commands are global, so only the process running shard 0 registers them
+        if self.shard_ids is None or 0 in self.shard_ids:
+            await self.sync_commands_if_changed()
+
+    # ✅ Slash commands are only re-registered when their definitions actually change
+    async def sync_commands_if_changed(self):
+        definitions = sorted(
+            (command.to_dict(self.tree) for command in self.tree.get_commands()), key=lambda c: c["name"]
+        )
+        digest = hashlib.sha256(json.dumps(definitions, sort_keys=True).encode("utf-8")).hexdigest()
+        if await r.get("commands:hash") == digest:
+            log.info("Slash commands unchanged; skipping sync")
+            return
+        await self.tree.sync()
+        await r.set("commands:hash", digest)
+        log.info("Synced %d slash commands globally!", len(definitions))
 
-bot = BeeBot(command_prefix="!", intents=intents)
+bot = BeeBot(command_prefix="!", intents=intents, shard_count=SHARD_COUNT, shard_ids=SHARD_IDS)
 
 # 📂 Load text-based data for rituals, facts, etc.
 def load_lines(filename):
     try:
         with open(filename, 'r', encoding='utf-8') as f:
             lines = [line.strip() for line in f if line.strip()]
-            bee_log(f"Loaded {len(lines)} lines from {filename}")
+            log.info("Loaded %d lines from %s", len(lines), filename)
             return lines
     except Exception as e:
-        bee_log(f"Error loading {filename}: {e}")
+        log.error("Error loading %s: %s", filename, e)
         return []
 
 # 🧬 Load personality text
@@ -145,124 +350,259 @@ def load_personality(file="personality.txt"):
     try:
         with open(file, "r", encoding="utf-8") as f:
             lines = f.read().strip()
-            bee_log(f"Personality loaded from {file}")
+            log.info("Personality loaded from %s", file)
             return lines
     except Exception as e:
-        bee_log(f"Error loading personality from {file}: {e}")
+        log.error("Error loading personality from %s: %s", file, e)
         return ""
 
-# 📚 Populate BeeBot's memory banks
-facts = load_lines("facts.txt")
-fortunes = load_lines("fortunes.txt")
-jokes = load_lines("jokes.txt")
-prefixes = load_lines("prefixes.txt")
-suffixes = load_lines("suffixes.txt")
-personality = load_personality()
-questions = load_lines("questions.txt")
-quiz_questions = load_lines("quiz.txt")
-bee_species = load_lines("bee_species.txt")
-banned_phrases = load_lines("banned_phrases.txt")
+# 📚 Populate BeeBot's memory banks: parsed once, indexed on disk, reloaded when a file changes
+CONTENT_FILES = {
+    "facts": ("facts.txt", "lines"),
+    "fortunes": ("fortunes.txt", "lines"),
+    "jokes": ("jokes.txt", "lines"),
+    "prefixes": ("prefixes.txt", "lines"),
+    "suffixes": ("suffixes.txt", "lines"),
+    "questions": ("questions.txt", "lines"),
+    "quiz": ("quiz.txt", "quiz"),
+    "bee_species": ("bee_species.txt", "lines"),
+}
+content = ContentStore(
+    r,
+    CONTENT_FILES,
+    cache_dir=os.getenv("CONTENT_CACHE_DIR", ".content_cache"),
+    check_interval=float(os.getenv("CONTENT_CHECK_INTERVAL", 5))
+)
+for corpus in CONTENT_FILES:
+    log.info("Loaded %d %s records from %s", len(content.get(corpus)), corpus, CONTENT_FILES[corpus][0])
+# 🔎 Local BM25 index over facts, species and quiz answers: answer outright when sure, else ground the prompt
+RETRIEVAL_ENABLED = os.getenv("RETRIEVAL_ENABLED", "on") == "on"
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", 3))
+RETRIEVAL_DIRECT_CONFIDENCE = float(os.getenv("RETRIEVAL_DIRECT_CONFIDENCE", 0.75))  # 0–1; above 1 disables
+RETRIEVAL_DIRECT_MARGIN = float(os.getenv("RETRIEVAL_DIRECT_MARGIN", 1.5))  # Best score vs runner-up
+RETRIEVAL_SNIPPET_CONFIDENCE = float(os.getenv("RETRIEVAL_SNIPPET_CONFIDENCE", 0.35))
+knowledge = KnowledgeBase(content)
+log.info("Retrieval index holds %d snippets", len(knowledge.index().snippets))
+banned_phrases = PhraseFilter(load_lines("banned_phrases.txt"))  # 🚫 Compiled once; see moderation.py
+# The rituals stand in for withheld replies, so they must pass the filter themselves
+for ritual in (line for lines in TONE_RITUALS.values() for line in lines):
+    if banned_phrases.find(ritual):
+        log.error("Fallback ritual contains banned phrase '%s': %s", banned_phrases.find(ritual), ritual)
 version_text = "\n".join(load_lines("version.txt"))
 
+# 🎭 Personas stay in memory; edited files are picked up within PERSONA_CHECK_INTERVAL seconds
+PERSONA_FILES = {
+    "default": "personality.txt",
+    "serious": "serious_personality.txt",
+}
+personas = PersonaRegistry(
+    PERSONA_FILES,
+    loader=load_personality,
+    check_interval=float(os.getenv("PERSONA_CHECK_INTERVAL", 5))
+)
+
+# 🎭 Guild persona overrides live in the `persona:overrides` hash; /persona announces changes on the
+# settings feed so every gateway process and worker reloads them
+async def load_persona_overrides():
+    personas.overrides = await r.hgetall("persona:overrides")
+    return len(personas.overrides)
+
+async def reload_persona_overrides():
+    try:
+        await load_persona_overrides()
+    except redis.RedisError as e:
+        log.warning("Couldn't reload persona overrides: %s", e)
+
+def on_setting_changed(key):
+    if key is None or key.startswith("persona:overrides"):
+        spawn(reload_persona_overrides())
+
+settings.watchers.append(on_setting_changed)
+
 # 🔒 Privacy check
-def check_privacy_consent(user_id):
-    consent = r.get(f"consent:{user_id}") == "on"
-    bee_log(f"Privacy consent check for {user_id}: {consent}")
+async def check_privacy_consent(user_id):
+    consent = gatekeeper.may_have_consented(user_id) and await settings.get(f"consent:{user_id}") == "on"
+    log.debug("Privacy consent check for %s: %s", user_id, consent)
     return consent
 
-# 🐝 Quiz question fetcher
-def get_random_quiz():
-    q = random.choice(quiz_questions)
-    parts = q.split('|')
-    return f"{parts[0]}\nA) {parts[1]}\nB) {parts[2]}\nC) {parts[3]}", parts[4] if len(parts) == 5 else ""
-
-# 🧠 Store recent messages and emotion for context awareness
-def store_context(user_id, thread_id, message_content, limit=6):
-    key = f"context:{thread_id}:{user_id}"
-    r.lpush(key, message_content)
-    r.ltrim(key, 0, limit - 1)
-    r.expire(key, 3600)
-    emotion = detect_emotion(message_content)
-    r.set(f"emotion:{thread_id}:{user_id}", emotion, ex=3600)
-    bee_log(f"Stored context and emotion ({emotion}) for user {user_id} in thread {thread_id}")
-
-# 🧠 Fetch recent context
-def get_context(user_id, thread_id):
-    context = r.lrange(f"context:{thread_id}:{user_id}", 0, -1)
-    bee_log(f"Fetched context for {user_id} in thread {thread_id}: {context}")
-    return context
-
-def get_emotion(user_id, thread_id):
-    emotion = r.get(f"emotion:{thread_id}:{user_id}") or "neutral"
-    bee_log(f"Fetched emotion for {user_id} in thread {thread_id}: {emotion}")
-    return emotion
-def ai_response(prompt, user_id=None, channel_id=None):
-    thread_id = channel_id or "general"
-    context_msgs = get_context(user_id, thread_id) if user_id and thread_id else []
-    emotion = get_emotion(user_id, thread_id) if user_id and thread_id else "neutral"
+# 🧠 Quiz rounds: A/B/C buttons, every click scored in one atomic Redis call, results shown when time is up
+QUIZ_ROUND_SECONDS = int(os.getenv("QUIZ_ROUND_SECONDS", 30))
+quiz_engine = QuizEngine(
+    r,
+    points=int(os.getenv("QUIZ_POINTS", 10)),
+    first_bonus=int(os.getenv("QUIZ_FIRST_BONUS", 5))
+)
 
-    # 🧬 Determine tone and select ritual
-    tone = choose_response_style(emotion)
-    rituals = TONE_RITUALS.get(tone, ["🐝"])
-    ritual = " ".join(random.sample(rituals, min(2, len(rituals))))  # ✅ Layering rituals for richness
+def render_quiz(item):
+    choices = "\n".join(f"{letter}) {text}" for letter, text in item.choices)
+    return f"**{item.question}**\n{choices}"
 
-    # 🧬 Persona file selection logic
-    serious_mode = r.get("serious_mode") == "on"
+def quiz_board(interaction):
+    return interaction.guild_id or "dm"  # DMs share one board
 
-    # 🧵 Thread detection to influence persona choice
-    if thread_id.startswith("dm:"):
-        current_channel = None
-        is_thread = False
-    else:
-        try:
-            current_channel = bot.get_channel(int(thread_id))
-            is_thread = isinstance(current_channel, discord.Thread) if current_channel else False
-        except (ValueError, TypeError):
-            current_channel = None
-            is_thread = False
+class QuizButton(discord.ui.Button):
+    def __init__(self, letter):
+        super().__init__(label=letter, style=discord.ButtonStyle.primary)
+        self.letter = letter
 
-    # 🔀 Persona switching based on emotion, mode, or thread context
-    if serious_mode or emotion in ["sad", "angry", "ashamed", "rejected"] or is_thread:
-        persona = load_personality("serious_personality.txt")
-        bee_log("Using serious_personality.txt")
-    else:
-        persona = load_personality("personality.txt")
-        bee_log("Using default personality.txt")
-
-    # 🧵 Construct full prompt with ritual, emotion tag, and historical context
-    context_text = "\n".join([f"User said: {msg}" for msg in reversed(context_msgs)])
-    full_prompt = (
-        f"{ritual}\nUser seems to be feeling {emotion}.\n{context_text}\nNow they say: {prompt}"
-        if context_text else f"{ritual}\n{prompt}"
-    )
+    async def callback(self, interaction: discord.Interaction):
+        try:
+            result = await quiz_engine.answer(
+                self.view.round_id, quiz_board(interaction), interaction.user.id, self.letter
+            )
+        except redis.RedisError as e:
+            log.warning("Quiz answer not recorded: %s", e)
+            await interaction.response.send_message("🐝 My hive memory hiccuped—try again in a moment!", ephemeral=True)
+            return
 
-    bee_log(f"Final prompt to OpenAI:\n{full_prompt}")
+        if result.status == "correct":
+            text = f"✅ Correct! +{result.points} points ({result.score} total, streak {result.streak} 🔥)"
+        elif result.status == "wrong":
+            text = f"❌ Not quite! Your streak resets. ({result.score} points total)"
+        elif result.status == "already":
+            text = "🐝 You've already answered this one!"
+        else:
+            text = "⏰ This round has ended."
+        await interaction.response.send_message(text, ephemeral=True)
+
+class QuizRound(discord.ui.View):
+    def __init__(self, item, round_id):
+        super().__init__(timeout=None)  # The round ends on its own clock, not after idle time
+        self.item = item
+        self.round_id = round_id
+        self.message = None
+        for letter, _ in item.choices:
+            self.add_item(QuizButton(letter))
+
+    async def run(self, seconds):
+        await asyncio.sleep(seconds)
+        self.stop()
+        for button in self.children:
+            button.disabled = True
+        try:
+            summary = await quiz_engine.close(self.round_id)
+            first = f" First to buzz in: <@{summary.first}>!" if summary.first else ""
+            results = f"{summary.correct} correct, {summary.wrong} wrong.{first}"
+        except redis.RedisError as e:
+            log.warning("Couldn't close quiz round %s: %s", self.round_id, e)
+            results = ""
+        answer = f"{self.item.answer}) {dict(self.item.choices)[self.item.answer]}"
+        try:
+            await self.message.edit(
+                content=f"{render_quiz(self.item)}\n\n⏰ Time's up! The answer was **{answer}**. {results}",
+                view=self,
+                allowed_mentions=discord.AllowedMentions.none()
+            )
+        except discord.HTTPException as e:
+            log.warning("Couldn't reveal quiz answer: %s", e)
 
-    # 🚫 Banned phrase filter
-    for phrase in banned_phrases:
-        if phrase.lower() in prompt.lower():
-            bee_log("Prompt blocked due to banned phrase.")
-            return "I'm not allowed to discuss that topic."
+# 🧠 Store recent messages and emotion for context awareness (consent-gated, one round trip)
+async def store_context(user_id, thread_id, channel_id, message_content, guild_id=None):
+    consent, autoreply, *serious = await settings.get_many(
+        [f"consent:{user_id}", f"autoreply:{channel_id}", serious_mode_key(guild_id), serious_mode_key()]
+    )
+    if consent != "on":
+        log.debug("Privacy consent missing for %s; nothing stored", user_id)
+        return MessageSnapshot(
+            consent=False,
+            autoreply=autoreply,
+            context=[],
+            emotion="neutral",
+            serious_mode=(serious[0] or serious[1]) == "on",
+            summary=None
+        )
 
-    # 🧠 API call with fallback for cozy error handling
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
+    # The script checks consent again, so a just-revoked consent is never written past
+    with metrics.time("stage_seconds", stage="emotion"):
+        emotion = await detect_emotion(message_content)
+    with metrics.time("stage_seconds", stage="redis"):
+        snapshot = await store.record_message(
+            user_id, thread_id, channel_id, encode_turn("user", message_content), emotion, guild_id
+        )
+    if snapshot.consent:
+        log.debug("Stored context and emotion (%s) for user %s in thread %s", emotion, user_id, thread_id)
+    else:
+        log.debug("Privacy consent missing for %s; nothing stored", user_id)
+    return snapshot
+
+async def serious_mode_on(guild_id=None):
+    guild_value, global_value = await settings.get_many([serious_mode_key(guild_id), serious_mode_key()])
+    return (guild_value or global_value) == "on"
+
+# 🧵 Rolling summaries for turns that fall outside the token budget
+async def summarize_turns(summary, turns, guild_id=None):
+    async def attempt(model):
+        return await client.chat.completions.create(
+            model=model,
             messages=[
-                {"role": "system", "content": persona},
-                {"role": "user", "content": full_prompt}
+                {
+                    "role": "system",
+                    "content": "Summarize this conversation between a user and BeeBot in at most 80 words. "
+                               "Keep feelings, names and anything BeeBot promised. Plain text only."
+                },
+                {"role": "user", "content": render_context(turns, summary)}
             ]
         )
-        reply = response.choices[0].message.content.strip()
-        bee_log(f"BeeBot's response: {reply}")
-        return reply
-    except Exception as e:
-        bee_log(f"Oh no! Error in AI response: {e}")
-        return "Oops! My wings got tangled while thinking. Try again soon!"
-def ai_response(prompt, user_id=None, channel_id=None):
+
+    async def complete():
+        return await openai_cascade.call(attempt, [SUMMARY_MODEL])
+
+    response = await ai_queue.submit("summaries", complete)
+    await record_usage(response.usage, guild_id)
+    return response.choices[0].message.content
+
+summarizer = ContextSummarizer(
+    store,
+    summarize_turns,
+    CONTEXT_TOKEN_BUDGET,
+    on_error=lambda key, e: log.warning("Couldn't summarize context for %s: %s", key, e)
+)
+
+# 🐎 Short, calm messages don't need the big model; everything falls back down OPENAI_MODELS
+def pick_models(prompt, emotion):
+    if OPENAI_FAST_MODEL and emotion == "neutral" and count_tokens(prompt) <= FAST_MODEL_MAX_TOKENS:
+        return [OPENAI_FAST_MODEL] + [model for model in OPENAI_MODELS if model != OPENAI_FAST_MODEL]
+    return OPENAI_MODELS
+
+# 📊 Token usage as reported by OpenAI, including how much of the prompt was served from its prefix cache
+async def record_usage(usage, guild_id=None):
+    if not usage:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = (getattr(details, "cached_tokens", None) or 0) if details else 0
+    metrics.inc("openai_tokens_total", usage.prompt_tokens, kind="prompt")
+    metrics.inc("openai_tokens_total", cached, kind="cached")
+    metrics.inc("openai_tokens_total", usage.completion_tokens, kind="completion")
+    try:
+        await store.add_token_usage(guild_id, usage.prompt_tokens, cached, usage.completion_tokens)
+    except redis.RedisError as e:
+        log.warning("Couldn't record token usage for %s: %s", guild_id, e)
+
+async def ai_response(prompt, user_id=None, channel_id=None, guild_id=None, snapshot=None, stream=None):
+    # 🚫 banned_phrases.txt lists what BeeBot must never *say*; users may say anything, so only replies are screened
     thread_id = channel_id or "general"
-    context_msgs = get_context(user_id, thread_id) if user_id and thread_id else []
-    emotion = get_emotion(user_id, thread_id) if user_id and thread_id else "neutral"
+    if snapshot:
+        context_msgs, emotion, summary = snapshot.context, snapshot.emotion, snapshot.summary
+    elif user_id and thread_id:
+        with metrics.time("stage_seconds", stage="redis"):
+            context_msgs, emotion, summary = await store.get_conversation(user_id, thread_id)
+    else:
+        context_msgs, emotion, summary = [], "neutral", None
+
+    # 🔎 Questions the content files already answer skip the model entirely
+    hits = knowledge.search(prompt, RETRIEVAL_TOP_K) if RETRIEVAL_ENABLED else []
+    # Someone who's struggling deserves more than a fact card, so only calm or cheerful moods get one
+    direct = emotion in ("neutral", "happy") and direct_answer(
+        prompt, hits, RETRIEVAL_DIRECT_CONFIDENCE, RETRIEVAL_DIRECT_MARGIN
+    )
+    if direct:
+        metrics.inc("replies_total", outcome="retrieved")
+        if user_id:
+            try:
+                await store.record_reply(user_id, thread_id, encode_turn("assistant", direct))
+            except redis.RedisError as e:
+                log.warning("Couldn't save reply: %s", e)
+        return direct
 
     # 🧬 Determine tone and select ritual
     tone = choose_response_style(emotion)
@@ -270,7 +610,7 @@ def ai_response(prompt, user_id=None, channel_id=None):
     ritual = " ".join(random.sample(rituals, min(2, len(rituals))))  # ✅ Layering rituals for richness
 
     # 🧬 Persona file selection logic
-    serious_mode = r.get("serious_mode") == "on"
+    serious_mode = snapshot.serious_mode if snapshot else await serious_mode_on(guild_id)
 
     # 🧵 Thread detection to influence persona choice
     if thread_id.startswith("dm:"):
@@ -286,143 +626,315 @@ def ai_response(prompt, user_id=None, channel_id=None):
 
     # 🔀 Persona switching based on emotion, mode, or thread context
     if serious_mode or emotion in ["sad", "angry", "ashamed", "rejected"] or is_thread:
-        persona = load_personality("serious_personality.txt")
-        bee_log("Using serious_personality.txt")
+        persona_name = "serious"
     else:
-        persona = load_personality("personality.txt")
-        bee_log("Using default personality.txt")
-
-    # 🧵 Construct full prompt with ritual, emotion tag, and historical context
-    context_text = "\n".join([f"User said: {msg}" for msg in reversed(context_msgs)])
-    full_prompt = (
-        f"{ritual}\nUser seems to be feeling {emotion}.\n{context_text}\nNow they say: {prompt}"
-        if context_text else f"{ritual}\n{prompt}"
-    )
+        persona_name = personas.for_guild(guild_id, "default")
+    persona = personas.get(persona_name)
+    log.debug("Using persona: %s", persona_name)
 
-    bee_log(f"Final prompt to OpenAI:\n{full_prompt}")
-
-    # 🚫 Banned phrase filter
-    for phrase in banned_phrases:
-        if phrase.lower() in prompt.lower():
-            bee_log("Prompt blocked due to banned phrase.")
-            return "I'm not allowed to discuss that topic."
+    # 💾 Replies without conversation context are reusable across users
+    cacheable = RESPONSE_CACHE_ENABLED and not context_msgs
+    if cacheable:
+        try:
+            cached = await response_cache.get(prompt, personas.digest(persona_name), tone)
+        except redis.RedisError as e:
+            log.warning("Response cache lookup failed: %s", e)
+            cached = None
+        if cached:
+            log.debug("Serving cached reply (hit rate %.0f%%)", response_cache.hit_rate * 100)
+            metrics.inc("replies_total", outcome="cached")
+            return cached
+
+    # 🧵 Fit history (newest first) into the token budget, skipping the messages being answered now
+    assembly_started = time.perf_counter()
+    turns = [decode_turn(raw) for raw in context_msgs]
+    while turns and turns[0][0] == "user" and turns[0][1] in prompt:
+        turns = turns[1:]
+    budget = CONTEXT_TOKEN_BUDGET - (count_tokens(summary) if summary else 0)
+    turns, overflow = fit_to_budget(turns, max(budget, 0))
+    if overflow and user_id:
+        summarizer.schedule(user_id, thread_id, guild_id)
+
+    # 🧱 Stable prefix (persona, rules, tone guide), then history as real turns, then this call's ritual,
+    # mood, bee notes and message — so consecutive calls share as long a cached prefix as possible
+    notes = [hit.snippet.text for hit in hits if hit.confidence >= RETRIEVAL_SNIPPET_CONFIDENCE]
+    messages = prompt_builder.build(persona, prompt, tone, emotion, ritual, turns, summary, notes)
+
+    log.debug("Final prompt to OpenAI:\n%s", messages[-1]["content"], extra={"sampled": True})
+
+    # 🧠 API call (queued fairly per guild) with fallback for cozy error handling
+    metrics.observe("stage_seconds", time.perf_counter() - assembly_started, stage="prompt")
+
+    queued_at = time.perf_counter()
+
+    async def attempt(model):
+        started = time.perf_counter()
+        metrics.inc("openai_requests_total", model=model)
+        if stream is None:
+            response = await client.chat.completions.create(model=model, messages=messages)
+            await record_usage(response.usage, guild_id)
+            return response.choices[0].message.content
+
+        # ✍️ Stream tokens into the placeholder, but stop showing partials if a banned phrase appears.
+        # A retried attempt starts over from empty text, which simply replaces the partial preview.
+        text = ""
+        withheld = False
+        chunks = await client.chat.completions.create(
+            model=model, messages=messages, stream=True, stream_options={"include_usage": True}
+        )
+        async for chunk in chunks:
+            await record_usage(chunk.usage, guild_id)  # Only the final chunk carries usage
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            if not text:
+                metrics.observe("stage_seconds", time.perf_counter() - started, stage="openai_first_token")
+            text += chunk.choices[0].delta.content
+            withheld = withheld or bool(banned_phrases.find(text))
+            if not withheld:
+                stream.update(text)
+        return text
+
+    async def complete():
+        metrics.observe("stage_seconds", time.perf_counter() - queued_at, stage="queue_wait")
+        with metrics.time("stage_seconds", stage="openai"):
+            return await openai_cascade.call(attempt, pick_models(prompt, emotion))
 
-    # 🧠 API call with fallback for cozy error handling
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": persona},
-                {"role": "user", "content": full_prompt}
-            ]
-        )
-        reply = response.choices[0].message.content.strip()
-        bee_log(f"BeeBot's response: {reply}")
-        return reply
+        reply = (await ai_queue.submit(str(guild_id or thread_id), complete)).strip()
+        log.debug("BeeBot's response: %s", reply, extra={"sampled": True})
+
+        # 🚫 Never let BeeBot say a banned phrase itself — fall back to the tone ritual
+        blocked = banned_phrases.find(reply)
+        if blocked:
+            log.warning("Reply withheld due to banned phrase: '%s'", blocked)
+            metrics.inc("replies_total", outcome="withheld")
+            return ritual
+    except HiveBusy as e:
+        log.warning("Shedding AI request: %s", e)
+        metrics.inc("replies_total", outcome="busy")
+        return BUSY_REPLY
+    except CircuitOpen as e:
+        log.warning("Serving a ritual reply: %s", e)
+        metrics.inc("replies_total", outcome="degraded")
+        return ritual
+    except (openai.APIError, asyncio.TimeoutError) as e:
+        log.error("OpenAI failed after retries: %r", e)
+        metrics.inc("replies_total", outcome="degraded")
+        return ritual
     except Exception as e:
-        bee_log(f"Oh no! Error in AI response: {e}")
+        log.error("Oh no! Error in AI response: %s", e)
+        metrics.inc("replies_total", outcome="error")
         return "Oops! My wings got tangled while thinking. Try again soon!"
 
+    metrics.inc("replies_total", outcome="ok")
+
+    try:
+        if cacheable:
+            await response_cache.put(prompt, personas.digest(persona_name), tone, reply)
+        if user_id:
+            await store.record_reply(user_id, thread_id, encode_turn("assistant", reply))
+    except redis.RedisError as e:
+        log.warning("Couldn't save reply: %s", e)
+    return reply
+
+# ✍️ Deliver an AI reply through `send`, streaming it into a placeholder when enabled
+async def send_ai_reply(send, prompt, **kwargs):
+    reply_stream = StreamingReply(send, interval=STREAM_EDIT_INTERVAL)
+    if STREAM_REPLIES:
+        with metrics.time("stage_seconds", stage="discord_send"):
+            await reply_stream.begin()
+        kwargs["stream"] = reply_stream
+    reply = await ai_response(prompt, **kwargs)
+    with metrics.time("stage_seconds", stage="discord_send"):
+        await reply_stream.finish(reply)
+    return reply
+
+# 🚦 Auto-replies: a quick burst from one user becomes one reply, rate-limited once
+async def reply_to_burst(key, burst):
+    user_id, _ = key
+    message, thread_id, snapshot = burst[-1]
+    guild_id = message.guild.id if message.guild else None
+
+    decision = await rate_limiter.hit(user=user_id, channel=message.channel.id, guild=guild_id)
+    if not decision.allowed:
+        log.info(
+            "Rate limited by %s bucket for %.1fs; skipping reply to %s", decision.scope, decision.retry_after, user_id
+        )
+        try:
+            await message.add_reaction("⏳")
+        except discord.HTTPException:
+            pass
+        return
+
+    if len(burst) > 1:
+        log.debug("Coalesced %d messages from %s into one reply", len(burst), user_id)
+    prompt = "\n".join(item[0].content for item in burst)
+    if AI_WORKERS:
+        await job_queue.enqueue(
+            kind="reply",
+            user_id=user_id,
+            thread_id=thread_id,
+            channel_id=message.channel.id,
+            guild_id=guild_id,
+            prompt=prompt,
+            created=time.time()
+        )
+        return
+    await send_ai_reply(
+        message.channel.send,
+        prompt,
+        user_id=user_id,
+        channel_id=thread_id,
+        guild_id=guild_id,
+        snapshot=snapshot
+    )
+
+reply_bursts = MessageCoalescer(
+    reply_to_burst,
+    window=COALESCE_WINDOW,
+    max_wait=COALESCE_MAX_WAIT,
+    on_error=lambda key, e: log.error("Oh no! Error replying to burst %s: %s", key, e)
+)
+
 @bot.event
 async def on_ready():
-    bee_log(f"Buzz buzz! I just logged in as {bot.user.name}! I'm ready to fly! 🎉")
-    await bot.tree.sync()
-    bee_log(f"Synced slash commands globally!")
-
-    for guild in bot.guilds:
-        bee_log(f"Setting up channels for guild: {guild.name}")
-
-        # 🔔 Version channel setup
-        version_id = r.get(f"channel:version:{guild.id}")
-        if version_id:
-            channel = bot.get_channel(int(version_id))
-            if channel:
-                await channel.send(
-                    f"**📢{version_text.splitlines()[0]} is online!**\n"
-                    f"Buzz buzz! Ready to support in **{guild.name}**.\n"
-                    f"Synced commands. Type `/bee_help` to see what's new!"
-                )
-                await channel.send(f"📜 Full version log:\n```\n{version_text}\n```")
-                bee_log(f"Sent startup message and full version.txt to #{channel.name} in {guild.name}")
-            else:
-                bee_log(f"Version channel ID {version_id} not found in guild {guild.name}.")
-        else:
-            bee_log(f"No version channel set for guild {guild.name}.")
+    log.info("Buzz buzz! I just logged in as %s! I'm ready to fly! 🎉", bot.user.name)
+
+    # 🔔 on_ready fires again on every reconnect; queue the notes on the first one only.
+    # The broadcast id is per deploy, so whichever process gets here first queues it for every guild.
+    if bot.version_announced:
+        return
+    bot.version_announced = True
+    try:
+        await queue_version_notes()
+    except redis.RedisError as e:
+        log.warning("Couldn't queue version notes: %s", e)
+
+# 🔔 Version notes to every guild's version channel, delivered by the broadcast leader
+async def queue_version_notes():
+    deploy = DEPLOY_ID or hashlib.sha256(version_text.encode("utf-8")).hexdigest()[:16]
+    parts = [
+        {"content": f"**📢{version_text.splitlines()[0]} is online!**\n"
+                    f"Buzz buzz! Ready to support this server.\n"
+                    f"Synced commands. Type `/bee_help` to see what's new!"},
+        {"content": f"📜 Full version log:\n```\n{version_text}\n```"},
+    ]
+    targets = await broadcaster.channels("version")
+    if await broadcaster.create(f"version:{deploy}", parts, targets):
+        log.info("Queued version notes for deploy %s to %d guild(s)", deploy, len(targets))
+    else:
+        log.info("Version notes already queued for deploy %s", deploy)
+
+async def send_broadcast_part(channel_id, part):
+    # Posting goes over REST, so the leader can reach guilds on any shard
+    channel = bot.get_partial_messageable(int(channel_id))
+    embed = discord.Embed.from_dict(part["embed"]) if "embed" in part else None
+    await channel.send(content=part.get("content"), embed=embed, allowed_mentions=discord.AllowedMentions.none())
+
+@tasks.loop(seconds=BROADCAST_POLL_SECONDS)
+async def deliver_broadcasts():
+    try:
+        if not await broadcast_leader.acquire():
+            return
+        # A big round outlasts the lease TTL, so renew it batch by batch and stop if another replica took over
+        delivered = await broadcaster.deliver_due(send_broadcast_part, renew=broadcast_leader.acquire)
+        if delivered:
+            log.info("Delivered broadcasts to %d guild(s)", delivered)
+    except redis.RedisError as e:
+        log.warning("Broadcast delivery skipped this round: %s", e)
+
+# 🔔 The /consent reminder, at most once per user per CONSENT_NAG_COOLDOWN across all replicas
+async def remind_consent(message, text):
+    try:
+        if not await gatekeeper.should_nag(str(message.author.id)):
+            return
+    except redis.RedisError as e:
+        log.warning("Couldn't check the consent reminder cooldown: %s", e)
+        return
+    await message.channel.send(text)
 
 @bot.event
 async def on_message(message):
     if message.author.bot:
         return
 
-    bee_log(f"Received message from {message.author} in {message.channel}: {message.content}")
+    log.debug("Received message from %s in %s: %s", message.author, message.channel, message.content)
 
     user_id = str(message.author.id)
 
     # 📨 DM Handling with privacy check and fallback ritual response
     if isinstance(message.channel, discord.DMChannel):
         thread_id = f"dm:{user_id}"
+        snapshot = None
+        if gatekeeper.may_have_consented(user_id):
+            snapshot = await store_context(user_id, thread_id, thread_id, message.content)
 
-        if not check_privacy_consent(user_id):
-            await message.channel.send("Please use `/consent` in a server to activate BeeBot in DMs.")
+        if not snapshot or not snapshot.consent:
+            await remind_consent(message, "Please use `/consent` in a server to activate BeeBot in DMs.")
             return
 
-        store_context(user_id, thread_id, message.content)
-
         if message.content.startswith("!"):
-            bee_log("BeeBot spotted a command in DM! Processing...")
+            log.debug("BeeBot spotted a command in DM! Processing...")
             await bot.process_commands(message)
         else:
-            bee_log("BeeBot is buzzing a DM reply!")
-            reply = ai_response(message.content, user_id=user_id, channel_id=thread_id)
-            await message.channel.send(reply)
+            log.debug("BeeBot is buzzing a DM reply!")
+            reply_bursts.add((user_id, thread_id), (message, thread_id, snapshot))
         return
 
     # 🌐 Server or thread message handling
     channel = message.channel
-    thread_id = str(channel.id if not isinstance(channel, discord.Thread) else channel.parent_id)
+    is_thread = isinstance(channel, discord.Thread)
 
-    if not check_privacy_consent(user_id):
-        await message.channel.send("Please use /consent to provide data consent before using BeeBot.")
+    # 🚪 Most messages land in channels BeeBot isn't answering in: drop them before any Redis work
+    if not gatekeeper.active(channel.id, is_thread):
+        metrics.inc("gateway_messages_total", outcome="inactive_channel")
+        return
+    if not gatekeeper.may_have_consented(user_id):
+        metrics.inc("gateway_messages_total", outcome="no_consent")
+        await remind_consent(message, "Please use /consent to provide data consent before using BeeBot.")
         return
+    metrics.inc("gateway_messages_total", outcome="accepted")
 
-    store_context(user_id, thread_id, message.content)
+    thread_id = str(channel.id if not is_thread else channel.parent_id)
+    snapshot = await store_context(user_id, thread_id, channel.id, message.content, message.guild.id)
 
-    # 💬 Auto-reply toggle and thread logic
-    channel_key = f"autoreply:{channel.id}"
-    value = r.get(channel_key)
-    is_thread = isinstance(channel, discord.Thread)
+    if not snapshot.consent:
+        await remind_consent(message, "Please use /consent to provide data consent before using BeeBot.")
+        return
+
+    # 💬 Auto-reply toggle and thread logic (the stored setting has the final word)
+    value = snapshot.autoreply
 
     if value == "on" or (value is None and is_thread):
         if message.content.startswith("!"):
-            bee_log("BeeBot spotted a command! Processing...")
+            log.debug("BeeBot spotted a command! Processing...")
             await bot.process_commands(message)
         else:
-            bee_log("BeeBot is about to buzz a reply!")
-            reply = ai_response(message.content, user_id=user_id, channel_id=thread_id)
-            await message.channel.send(reply)
+            log.debug("BeeBot is about to buzz a reply!")
+            reply_bursts.add((user_id, str(channel.id)), (message, thread_id, snapshot))
 
 # 🧠 Fun and Emotional Support Commands
 
 @bot.tree.command(name="bee_fact", description="Get a random bee-related fact")
 async def bee_fact(interaction: discord.Interaction):
-    await interaction.response.send_message(random.choice(facts))
+    await interaction.response.send_message(await content.pick("facts", interaction.channel_id))
 
 @bot.tree.command(name="bee_fortune", description="Receive a bee-themed fortune")
 async def bee_fortune(interaction: discord.Interaction):
-    await interaction.response.send_message(random.choice(fortunes))
+    await interaction.response.send_message(await content.pick("fortunes", interaction.channel_id))
 
 @bot.tree.command(name="bee_joke", description="Hear a bee joke")
 async def bee_joke(interaction: discord.Interaction):
-    await interaction.response.send_message(random.choice(jokes))
+    await interaction.response.send_message(await content.pick("jokes", interaction.channel_id))
 
 @bot.tree.command(name="bee_name", description="Generate and apply a random bee name as your nickname")
 async def bee_name(interaction: discord.Interaction):
-    name = f"{random.choice(prefixes)}{random.choice(suffixes)}"
-    bee_log(f"Generated bee name: {name} for user {interaction.user} in guild {interaction.guild}")
+    name = f"{content.random('prefixes')}{content.random('suffixes')}"
+    log.debug("Generated bee name: %s for user %s in guild %s", name, interaction.user, interaction.guild)
 
     try:
         member = await interaction.guild.fetch_member(interaction.user.id)
-        bee_log(f"Fetched member: {member} (ID: {member.id})")
+        log.debug("Fetched member: %s (ID: %s)", member, member.id)
 
         if interaction.guild.owner_id == member.id:
             await interaction.response.send_message(
@@ -444,31 +956,75 @@ async def bee_name(interaction: discord.Interaction):
         )
 
     except Exception as e:
-        bee_log(f"Unexpected error changing nickname: {e}")
+        log.warning("Unexpected error changing nickname: %s", e)
         await interaction.response.send_message(
             f"🔍 Couldn't find your member info to update nickname, but your bee name is: **{name}**."
         )
 
 @bot.tree.command(name="bee_question", description="Get a deep or fun question")
 async def bee_question(interaction: discord.Interaction):
-    await interaction.response.send_message(random.choice(questions))
+    await interaction.response.send_message(await content.pick("questions", interaction.channel_id))
 
-@bot.tree.command(name="bee_quiz", description="Take a random bee quiz")
+@bot.tree.command(name="bee_quiz", description="Start a timed bee quiz round")
 async def bee_quiz(interaction: discord.Interaction):
-    q, _ = get_random_quiz()
-    await interaction.response.send_message(q)
+    item = await content.pick("quiz", interaction.channel_id)
+    if not item:
+        await interaction.response.send_message("🐝 No quiz questions in the hive yet!")
+        return
+    view = QuizRound(item, await quiz_engine.start(item, QUIZ_ROUND_SECONDS))
+    await interaction.response.send_message(
+        f"🧠 **Quiz time!** You have {QUIZ_ROUND_SECONDS} seconds.\n{render_quiz(item)}", view=view
+    )
+    view.message = await interaction.original_response()
+    spawn(view.run(QUIZ_ROUND_SECONDS))
+
+@bot.tree.command(name="bee_leaderboard", description="See this server's top quiz bees")
+async def bee_leaderboard(interaction: discord.Interaction):
+    board = quiz_board(interaction)
+    top = await quiz_engine.leaderboard(board, 10)
+    rank, points, best = await quiz_engine.standing(board, interaction.user.id)
+    if not top:
+        await interaction.response.send_message("🐝 No quiz scores yet—start a round with `/bee_quiz`!")
+        return
+    medals = ["🥇", "🥈", "🥉"]
+    lines = [
+        f"{medals[index] if index < 3 else f'{index + 1}.'} <@{user_id}> — {score} points"
+        for index, (user_id, score) in enumerate(top)
+    ]
+    you = f"You're #{rank} with {points} points (best streak {best})." if rank else "You haven't scored yet!"
+    await interaction.response.send_message(
+        "🏆 **Quiz leaderboard**\n" + "\n".join(lines) + f"\n\n{you}",
+        allowed_mentions=discord.AllowedMentions.none()
+    )
 
 @bot.tree.command(name="bee_species", description="Learn about a random bee species")
 async def bee_species_cmd(interaction: discord.Interaction):
-    await interaction.response.send_message(random.choice(bee_species))
+    await interaction.response.send_message(await content.pick("bee_species", interaction.channel_id))
 
 @bot.tree.command(name="ask", description="Ask BeeBot a question")
 @app_commands.describe(question="Your question to BeeBot")
 async def ask(interaction: discord.Interaction, question: str):
-    if not check_privacy_consent(str(interaction.user.id)):
-        await interaction.response.send_message("Please use /consent to provide data consent before using BeeBot.")
+    await interaction.response.defer(thinking=True)  # ✅ Acknowledge within Discord's 3-second window
+    if not await check_privacy_consent(str(interaction.user.id)):
+        await interaction.followup.send("Please use /consent to provide data consent before using BeeBot.")
         return
-    await interaction.response.send_message(ai_response(question))
+
+    if AI_WORKERS:
+        # A worker answers through the interaction's webhook, valid for 15 minutes
+        await job_queue.enqueue(
+            kind="ask",
+            application_id=interaction.application_id,
+            token=interaction.token,
+            guild_id=interaction.guild_id,
+            prompt=question,
+            created=time.time()
+        )
+        return
+
+    async def send(content):
+        return await interaction.followup.send(content, wait=True)
+
+    await send_ai_reply(send, question, guild_id=interaction.guild_id)
 
 @bot.tree.command(name="bee_validate", description="Get emotional validation")
 async def bee_validate(interaction: discord.Interaction):
@@ -483,22 +1039,141 @@ async def consent(interaction: discord.Interaction, choice: str):
     elif choice.lower() == "info":
         await interaction.response.send_message("This is the privacy policy.")
     else:
-        r.set(f"consent:{interaction.user.id}", choice.lower())
+        await settings.set(f"consent:{interaction.user.id}", choice.lower())
+        await gatekeeper.set_consent(interaction.user.id, choice.lower())
         await interaction.response.send_message(f"Consent {choice.lower()}.")
-# 📅 Reminders
+# 📅 Reminders: the text is the user's own, so it may ping its owner but never @everyone or a role
+REMINDER_MENTIONS = discord.AllowedMentions(users=True, everyone=False, roles=False)
+
+async def deliver_reminder(reminder):
+    try:
+        if reminder.channel_id:
+            # Posting goes over REST, so this works whichever process holds the guild's shard
+            channel = bot.get_channel(int(reminder.channel_id)) or bot.get_partial_messageable(int(reminder.channel_id))
+            await channel.send(
+                f"⏰ <@{reminder.user_id}> Buzz buzz! You asked me to remind you: **{reminder.text}**",
+                allowed_mentions=REMINDER_MENTIONS
+            )
+        else:
+            user = await bot.fetch_user(int(reminder.user_id))
+            await user.send(
+                f"⏰ Buzz buzz! You asked me to remind you: **{reminder.text}**", allowed_mentions=REMINDER_MENTIONS
+            )
+    except discord.HTTPException as e:
+        if 400 <= e.status < 500 and e.status != 429:  # Missing channel, no access, bad content: retrying can't help
+            log.warning("Dropping reminder %s for %s: %s", reminder.id, reminder.user_id, e)
+        elif await reminder_store.failed(reminder):
+            log.warning("Reminder %s will be retried after its lease expires: %s", reminder.id, e)
+            return
+        else:
+            log.warning("Giving up on reminder %s after %d attempts: %s", reminder.id, REMINDER_MAX_ATTEMPTS, e)
+            return
+    await reminder_store.ack(reminder)
+
+@tasks.loop(seconds=REMINDER_POLL_SECONDS)
+async def dispatch_reminders():
+    try:
+        if not await reminder_leader.acquire():
+            return
+        while True:
+            due = await reminder_store.claim_due(REMINDER_BATCH)
+            if due:
+                log.info("Delivering %d reminder(s)", len(due))
+                await asyncio.gather(*(deliver_reminder(reminder) for reminder in due))
+            if len(due) < REMINDER_BATCH:
+                break
+    except redis.RedisError as e:
+        log.warning("Reminder dispatch skipped this round: %s", e)
+
+# 🧩 Per-shard heartbeats in Redis, read back by /bee_stats from any process
+@tasks.loop(seconds=SHARD_HEALTH_INTERVAL)
+async def report_shard_health():
+    guilds_per_shard = Counter(guild.shard_id for guild in bot.guilds)
+    shards = {}
+    for shard_id, shard in bot.shards.items():
+        latency = shard.latency
+        shards[shard_id] = {
+            "latency_ms": round(latency * 1000, 1) if math.isfinite(latency) else None,
+            "guilds": guilds_per_shard[shard_id],
+            "connected": not shard.is_closed(),
+            "ws_ratelimited": shard.is_ws_ratelimited(),
+        }
+    try:
+        await shard_health.report(shards)
+    except redis.RedisError as e:
+        log.warning("Couldn't report shard health: %s", e)
+
+@report_shard_health.before_loop
+async def before_report_shard_health():
+    await bot.wait_until_ready()
+
+@bot.event
+async def on_shard_disconnect(shard_id):
+    log.warning("Shard %d disconnected", shard_id)
+
+@bot.event
+async def on_shard_resumed(shard_id):
+    log.info("Shard %d resumed", shard_id)
+
 @bot.tree.command(name="set_reminder", description="Set a personal reminder")
-@app_commands.describe(time="When to remind", reminder="What to remind you of")
+@app_commands.describe(time="When to remind (e.g. 'in 20m', '2h30m', 'tomorrow at 9am', '17:30' UTC)", reminder="What to remind you of")
 async def set_reminder(interaction: discord.Interaction, time: str, reminder: str):
-    await interaction.response.send_message(f"Reminder set for {time}: {reminder}")
+    if not await check_privacy_consent(str(interaction.user.id)):
+        await interaction.response.send_message("Please use /consent to provide data consent before using BeeBot.")
+        return
+
+    due = parse_when(time)
+    if due is None or due <= datetime.now(timezone.utc):
+        await interaction.response.send_message(
+            "🤔 I couldn't understand that time (or it's too far away). Try `in 20m`, `2h30m`, `tomorrow at 9am` or `2025-08-01 14:00` (UTC).",
+            ephemeral=True
+        )
+        return
+    if len(reminder) > REMINDER_MAX_LENGTH:
+        await interaction.response.send_message(
+            f"📏 That reminder is a bit long for me to carry. Keep it under {REMINDER_MAX_LENGTH} characters, please!",
+            ephemeral=True
+        )
+        return
+
+    reminder_id = await reminder_store.add(str(interaction.user.id), interaction.channel_id, reminder, due)
+    if reminder_id is None:
+        await interaction.response.send_message(
+            f"🐝 You already have {REMINDER_MAX_PER_USER} reminders buzzing. Delete one with `/delete_reminder` first!",
+            ephemeral=True
+        )
+        return
+    stamp = int(due.timestamp())
+    await interaction.response.send_message(
+        f"⏰ Reminder set for <t:{stamp}:F> (<t:{stamp}:R>): {reminder}", allowed_mentions=discord.AllowedMentions.none()
+    )
 
 @bot.tree.command(name="get_reminders", description="View your active reminders")
 async def get_reminders(interaction: discord.Interaction):
-    await interaction.response.send_message("Here are your reminders:")
+    reminders = await reminder_store.list_for_user(str(interaction.user.id))
+    if not reminders:
+        await interaction.response.send_message("🌼 You have no active reminders.", ephemeral=True)
+        return
+    lines = [
+        f"**{i}.** <t:{int(item.due.timestamp())}:R> — {item.text if len(item.text) <= 100 else item.text[:99] + '…'}"
+        for i, item in enumerate(reminders, start=1)
+    ]
+    # Short entries keep the list to one message in practice; split anyway so the indexes always arrive
+    first, *rest = split_message("📅 Here are your reminders:\n" + "\n".join(lines))
+    await interaction.response.send_message(first, ephemeral=True)
+    for chunk in rest:
+        await interaction.followup.send(chunk, ephemeral=True)
 
 @bot.tree.command(name="delete_reminder", description="Delete a reminder by index")
-@app_commands.describe(index="Reminder index to delete")
+@app_commands.describe(index="Reminder index to delete (see /get_reminders)")
 async def delete_reminder(interaction: discord.Interaction, index: int):
-    await interaction.response.send_message(f"Reminder {index} deleted.")
+    user_id = str(interaction.user.id)
+    reminders = await reminder_store.list_for_user(user_id)
+    if not 1 <= index <= len(reminders):
+        await interaction.response.send_message("⚠️ No reminder with that number. Check `/get_reminders`.", ephemeral=True)
+        return
+    await reminder_store.delete(user_id, reminders[index - 1].id)
+    await interaction.response.send_message(f"🗑️ Reminder {index} deleted.", ephemeral=True)
 
 # 🌍 Crisis Support Info
 @bot.tree.command(name="crisis", description="View global crisis helplines")
@@ -530,7 +1205,8 @@ async def bee_help(interaction: discord.Interaction):
 /bee_joke — Hear a bee joke  
 /bee_name — Generate a random bee name  
 /bee_question — Get a deep or fun question to think about  
-/bee_quiz — Take a random bee quiz (multiple choice)  
+/bee_quiz — Start a timed bee quiz round (multiple choice)  
+/bee_leaderboard — See this server's top quiz bees  
 /bee_species — Learn about a random bee species  
 /bee_validate — Get some emotional validation  
 
@@ -540,6 +1216,9 @@ async def bee_help(interaction: discord.Interaction):
 /autoreply — Enable or disable AI auto-reply in the current channel  
 /dm — Get a direct message from BeeBot for cozy support  
 /invite — Invite BeeBot to your own server  
+/persona — Choose BeeBot's persona for this server  
+/reload_personas — Reload persona files after editing them  
+/bee_stats — See BeeBot's latency, cache and queue stats  
 
 🛠️ Context & Emotion Debugging
 
@@ -549,6 +1228,8 @@ async def bee_help(interaction: discord.Interaction):
 📢 Announcements & Channel Setup
 
 /announce — Send an announcement to the designated channel  
+/broadcast — (Bot owner) Send an announcement to every server's announcement channel  
+/broadcast_status — (Bot owner) See how far a broadcast has got  
 /set_version_channel — Set the current channel for version logs  
 /set_announcement_channel — Set the current channel for announcements  
 /set_error_channel — Set the current channel for error messages  
@@ -571,17 +1252,19 @@ async def bee_help(interaction: discord.Interaction):
 # 🛠️ Channel Configuration
 @bot.tree.command(name="set_version_channel", description="Set this channel as the version log")
 async def set_version_channel(interaction: discord.Interaction):
-    r.set(f"channel:version:{interaction.guild.id}", interaction.channel.id)
+    await settings.set(f"channel:version:{interaction.guild.id}", interaction.channel.id)
+    await broadcaster.register_channel("version", interaction.guild.id, interaction.channel.id)
     await interaction.response.send_message("✅ This channel has been set as the **version** channel.")
 
 @bot.tree.command(name="set_announcement_channel", description="Set this channel for announcements")
 async def set_announcement_channel(interaction: discord.Interaction):
-    r.set(f"channel:announcement:{interaction.guild.id}", interaction.channel.id)
+    await settings.set(f"channel:announcement:{interaction.guild.id}", interaction.channel.id)
+    await broadcaster.register_channel("announcement", interaction.guild.id, interaction.channel.id)
     await interaction.response.send_message("📢 This channel has been set as the **announcement** channel.")
 
 @bot.tree.command(name="set_error_channel", description="Set this channel for error messages")
 async def set_error_channel(interaction: discord.Interaction):
-    r.set(f"channel:error:{interaction.guild.id}", interaction.channel.id)
+    await settings.set(f"channel:error:{interaction.guild.id}", interaction.channel.id)
     await interaction.response.send_message("⚠️ This channel has been set as the **error** channel.")
 
 @bot.tree.command(name="autoreply", description="Enable or disable AI auto-reply in this channel.")
@@ -592,7 +1275,7 @@ async def autoreply(interaction: discord.Interaction, mode: str = None):
     channel_key = f"autoreply:{channel_id}"
 
     if mode is None:
-        value = r.get(channel_key)
+        value = await settings.get(channel_key)
         status = value or ("on" if isinstance(channel, discord.Thread) else "off")
         await interaction.response.send_message(
             f"💬 Auto-reply is currently **{status}** in this channel.",
@@ -605,8 +1288,9 @@ async def autoreply(interaction: discord.Interaction, mode: str = None):
         await interaction.response.send_message("⚠️ Mode must be either `on` or `off`.", ephemeral=True)
         return
 
-    r.set(channel_key, mode)
-    print(f"Auto-reply set to {mode} for channel {channel.name} ({channel.id})")
+    await settings.set(channel_key, mode)
+    await gatekeeper.set_autoreply(channel_id, mode)
+    log.info("Auto-reply set to %s for channel %s (%s)", mode, channel.name, channel.id)
     await interaction.response.send_message(f"✅ Auto-reply has been turned **{mode}** in this channel.")
 
 # 📢 Announcement Command with Role Check
@@ -627,11 +1311,11 @@ async def announce(interaction: Interaction, title: str, description: str):
         return
 
     try:
-        announcement_id = r.get(f"channel:announcement:{guild.id}")
-        print(f"Redis announcement channel ID: {announcement_id}")
+        announcement_id = await settings.get(f"channel:announcement:{guild.id}")
+        log.debug("Announcement channel ID: %s", announcement_id)
 
         if announcement_id:
-            announcement_channel = await bot.fetch_channel(int(announcement_id))
+            announcement_channel = guild.get_channel(int(announcement_id)) or await bot.fetch_channel(int(announcement_id))
         else:
             announcement_channel = discord.utils.get(guild.text_channels, name="announcements")
 
@@ -652,27 +1336,74 @@ async def announce(interaction: Interaction, title: str, description: str):
 
         await announcement_channel.send(embed=embed)
         await interaction.followup.send("✅ Announcement sent!", ephemeral=True)
-        print(f"Sent announcement to #{announcement_channel.name} in {guild.name}: {title}")
+        log.info("Sent announcement to #%s in %s: %s", announcement_channel.name, guild.name, title)
 
     except discord.Forbidden:
         await interaction.followup.send("❌ I don't have permission to send messages in that channel.", ephemeral=True)
     except discord.HTTPException as e:
         await interaction.followup.send("⚠️ Failed to send the announcement due to an error.", ephemeral=True)
-        print(f"Announcement error: {e}")
+        log.error("Announcement error: %s", e)
+
+# 📣 Broadcast: the same announcement to every server's announcement channel, queued and rate-paced
+@bot.tree.command(name="broadcast", description="(Bot owner) Send an announcement to every server's announcement channel.")
+@app_commands.describe(title="The title of your announcement", description="The body of your announcement")
+async def broadcast(interaction: Interaction, title: str, description: str):
+    if not await bot.is_owner(interaction.user):
+        await interaction.response.send_message("⛔ Only BeeBot's owner can broadcast to every server.", ephemeral=True)
+        return
+    await interaction.response.defer(ephemeral=True)
+
+    embed = discord.Embed(title=f"📢 {title}", description=description, color=discord.Color.gold())
+    embed.set_footer(text="From the BeeBot team")
+    embed.timestamp = datetime.now(timezone.utc)
+    broadcast_id = f"announce:{int(time.time())}:{interaction.id}"
+    try:
+        targets = await broadcaster.channels("announcement")
+        if not await broadcaster.create(broadcast_id, [{"embed": embed.to_dict()}], targets):
+            await interaction.followup.send("⚠️ No server has an announcement channel set.", ephemeral=True)
+            return
+    except redis.RedisError as e:
+        log.error("Couldn't queue broadcast: %s", e)
+        await interaction.followup.send("⚠️ Couldn't queue the broadcast, please try again.", ephemeral=True)
+        return
+    log.info("Queued broadcast %s to %d guild(s): %s", broadcast_id, len(targets), title)
+    await interaction.followup.send(
+        f"📣 Queued for **{len(targets)}** server(s). Check progress with `/broadcast_status {broadcast_id}`.",
+        ephemeral=True
+    )
+
+@bot.tree.command(name="broadcast_status", description="(Bot owner) See how far a broadcast has got.")
+@app_commands.describe(broadcast_id="The id /broadcast gave you")
+async def broadcast_status(interaction: Interaction, broadcast_id: str):
+    if not await bot.is_owner(interaction.user):
+        await interaction.response.send_message("⛔ Only BeeBot's owner can check broadcasts.", ephemeral=True)
+        return
+    summary = await broadcaster.summary(broadcast_id)
+    if summary is None:
+        await interaction.response.send_message("🤷 No broadcast with that id (they're kept for 30 days).", ephemeral=True)
+        return
+    counts = ", ".join(f"{status}: {count}" for status, count in sorted(summary["counts"].items()))
+    failures = "\n".join(f"- {guild}: {reason}" for guild, reason in list(summary["failures"].items())[:10])
+    await interaction.response.send_message(
+        f"📣 **{broadcast_id}** — {summary['total']} server(s): {counts}"
+        + (f"\nFailures:\n{failures}" if failures else ""),
+        ephemeral=True
+    )
 
 # 🧠 Debugging Tools for Context & Emotion
 @bot.tree.command(name="debug_context", description="View recent context and emotion")
 @app_commands.describe(target="Mention a user to inspect")
 async def debug_context(interaction: Interaction, target: discord.User):
     thread_id = str(interaction.channel.id if not isinstance(interaction.channel, discord.Thread) else interaction.channel.parent_id)
-    context = get_context(str(target.id), thread_id)
-    emotion = get_emotion(str(target.id), thread_id)
-    if not context:
+    context, emotion, summary = await store.get_conversation(str(target.id), thread_id)
+    if not context and not summary:
         await interaction.response.send_message(f"No context found for {target.mention}.", ephemeral=True)
     else:
-        msg_log = "\n".join([f"- {m}" for m in reversed(context)])
+        turns = [decode_turn(raw) for raw in context]
+        msg_log = render_context(turns, summary)
+        tokens = sum(count_tokens(content) for _, content in turns)
         await interaction.response.send_message(
-            f"🧠 **Context for {target.mention}**\n```\n{msg_log}\n```\n ❤️ Emotion: **{emotion}**",
+            f"🧠 **Context for {target.mention}** (~{tokens} tokens)\n```\n{msg_log[-1800:]}\n```\n ❤️ Emotion: **{emotion}**",
             ephemeral=True
         )
 
@@ -680,19 +1411,104 @@ async def debug_context(interaction: Interaction, target: discord.User):
 @app_commands.describe(target="Mention a user to clear")
 async def clear_context(interaction: Interaction, target: discord.User):
     thread_id = str(interaction.channel.id if not isinstance(interaction.channel, discord.Thread) else interaction.channel.parent_id)
-    r.delete(f"context:{thread_id}:{target.id}")
-    r.delete(f"emotion:{thread_id}:{target.id}")
+    await store.clear_context(target.id, thread_id)
     await interaction.response.send_message(f"🧹 Cleared context and emotion for {target.mention}.", ephemeral=True)
 
 # 🎭 Serious Personality Toggle
 @bot.tree.command(name="serious_mode", description="Toggle BeeBot serious personality")
 @app_commands.describe(mode="on or off")
 async def serious_mode(interaction: discord.Interaction, mode: str):
+    # Without a guild, serious_mode_key() is the global fallback every server reads, so no DM toggling
+    if interaction.guild_id is None:
+        await interaction.response.send_message("Serious mode is set per server; use this in a server.", ephemeral=True)
+        return
     if mode.lower() not in ["on", "off"]:
         await interaction.response.send_message("Choose `on` or `off`.", ephemeral=True)
         return
-    r.set("serious_mode", mode.lower())
-    await interaction.response.send_message(f"Serious mode is now **{mode.lower()}**.", ephemeral=True)
+    await settings.set(serious_mode_key(interaction.guild_id), mode.lower())
+    await interaction.response.send_message(f"Serious mode is now **{mode.lower()}** in this server.", ephemeral=True)
+
+# 🎭 Persona management
+@bot.tree.command(name="persona", description="Choose BeeBot's default persona for this server")
+@app_commands.describe(name="Persona name, 'reset' to use the default, or leave blank to check")
+@app_commands.default_permissions(manage_guild=True)
+async def persona(interaction: discord.Interaction, name: str = None):
+    guild_id = str(interaction.guild_id)
+    if name is None:
+        current = personas.for_guild(guild_id, "default")
+        await interaction.response.send_message(
+            f"🎭 This server uses the **{current}** persona. Available: {', '.join(personas.names())}",
+            ephemeral=True
+        )
+        return
+
+    name = name.lower()
+    if name == "reset":
+        await r.hdel("persona:overrides", guild_id)
+        personas.overrides.pop(guild_id, None)
+        await settings.changed(f"persona:overrides:{guild_id}")
+    elif name in personas.files:
+        await r.hset("persona:overrides", guild_id, name)
+        personas.overrides[guild_id] = name
+        await settings.changed(f"persona:overrides:{guild_id}")
+    else:
+        await interaction.response.send_message(
+            f"⚠️ Unknown persona. Choose one of: {', '.join(personas.names())}, or `reset`.", ephemeral=True
+        )
+        return
+    await interaction.response.send_message(
+        f"🎭 Persona is now **{personas.for_guild(guild_id, 'default')}** in this server.", ephemeral=True
+    )
+
+@bot.tree.command(name="reload_personas", description="Reload persona files from disk")
+@app_commands.default_permissions(manage_guild=True)
+async def reload_personas(interaction: discord.Interaction):
+    personas.reload()
+    await interaction.response.send_message("🔄 Persona files reloaded.", ephemeral=True)
+
+# 📊 Hot-path stats for server managers
+@bot.tree.command(name="bee_stats", description="Show BeeBot latency, cache and queue stats")
+@app_commands.default_permissions(manage_guild=True)
+async def bee_stats(interaction: discord.Interaction):
+    lines = ["stage              count    p50 ms    p95 ms    p99 ms"]
+    for (name, labels), histogram in sorted(metrics.histograms.items()):
+        if name != "stage_seconds":
+            continue
+        stage = dict(labels).get("stage", "?")
+        p50, p95, p99 = (histogram.quantile(q) * 1000 for q in (0.5, 0.95, 0.99))
+        lines.append(f"{stage:<18} {histogram.count:>5} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f}")
+
+    outcomes = ", ".join(
+        f"{dict(labels)['outcome']}: {value}"
+        for (name, labels), value in sorted(metrics.counters.items()) if name == "replies_total"
+    )
+    tokens_in = metrics.counter_value("openai_tokens_total", kind="prompt")
+    tokens_out = metrics.counter_value("openai_tokens_total", kind="completion")
+    tokens_cached = metrics.counter_value("openai_tokens_total", kind="cached")
+    token_line = f"🔢 Tokens: {tokens_in} prompt ({tokens_cached} cached) / {tokens_out} completion"
+    if interaction.guild:
+        spend = await store.token_usage(interaction.guild.id)
+        token_line += (
+            f"\n🧾 This server today: {spend['prompt']} prompt ({spend['cached']} cached) / {spend['completion']} completion"
+        )
+    health = await shard_health.read(bot.shard_count or 0)
+    quiet = [str(shard_id) for shard_id, status in health.items() if not status or not status["connected"]]
+    shard_line = f"🧩 Shards: **{len(health) - len(quiet)}/{len(health)}** healthy"
+    if quiet:
+        shard_line += f" (quiet: {', '.join(quiet[:20])}{'…' if len(quiet) > 20 else ''})"
+    if interaction.guild:
+        shard_line += f"; this server is on shard {interaction.guild.shard_id} ({CLUSTER_NAME})"
+    if AI_WORKERS:
+        shard_line += f"\n📬 Reply jobs waiting for workers: **{await job_queue.backlog()}**"
+    await interaction.response.send_message(
+        "📊 **BeeBot stats**\n```\n" + "\n".join(lines) + "\n```\n"
+        f"💬 Replies — {outcomes or 'none yet'}\n"
+        f"💾 Response cache hit rate: **{response_cache.hit_rate:.0%}** ({response_cache.stats})\n"
+        f"🚦 AI queue: **{ai_queue.active}** running, **{ai_queue.waiting}** waiting\n"
+        f"{token_line}\n"
+        f"{shard_line}",
+        ephemeral=True
+    )
 
 # 🕊️ Invite BeeBot to another server
 @bot.tree.command(name="invite", description="Get BeeBot's invite link to add it to your server")
@@ -710,4 +1526,5 @@ async def dm(interaction: discord.Interaction):
     except discord.Forbidden:
         await interaction.response.send_message("❌ I couldn't send a DM—make sure they're enabled!", ephemeral=True)
 
-bot.run(DISCORD_TOKEN)
\ No newline at end of file
+if __name__ == "__main__":  # worker.py imports this module for the reply pipeline
+    bot.run(DISCORD_TOKEN, log_handler=None)  # discord.py logs flow through our queued handler too
\ No newline at end of file
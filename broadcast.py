@@ -0,0 +1,223 @@
+# 📣 BeeBot broadcasts — one message fanned out to every configured guild, tracked per guild in Redis
+import asyncio
+import json
+import random
+import time
+from collections import Counter, namedtuple
+
+import aiohttp
+import discord
+
+from storage import backfill_index
+
+ACTIVE = "broadcasts:active"
+
+# 📦 One guild's share of a broadcast: which parts are still to go and how often it has been tried
+Delivery = namedtuple("Delivery", "broadcast_id guild_id channel_id parts done attempts")
+
+# 🗂️ Create a broadcast once: a second call with the same id (say, after a restart) changes nothing.
+#   KEYS: broadcast, targets, status, due, active set
+#   ARGV: id, parts JSON, created, now, then guild/channel pairs
+CREATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'parts', ARGV[2], 'created', ARGV[3], 'total', (#ARGV - 4) / 2)
+for i = 5, #ARGV, 2 do
+    redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 1])
+    redis.call('HSET', KEYS[3], ARGV[i], 'pending')
+    redis.call('ZADD', KEYS[4], ARGV[4], ARGV[i])
+end
+redis.call('SADD', KEYS[5], ARGV[1])
+return 1
+"""
+
+# ⏳ Lease due guilds: they stay in the due set, pushed `lease` seconds out, until delivered or given up on
+#   KEYS: due   ARGV: now, lease seconds, count
+CLAIM_SCRIPT = """
+local guilds = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[3]))
+for _, guild in ipairs(guilds) do
+    redis.call('ZADD', KEYS[1], tonumber(ARGV[1]) + tonumber(ARGV[2]), guild)
+end
+return guilds
+"""
+
+
+def retry_delay(error):
+    """Seconds to wait before trying again, or None when trying again can't help."""
+    if isinstance(error, discord.RateLimited):
+        return error.retry_after
+    if isinstance(error, discord.HTTPException):
+        if error.status == 429:
+            return float(error.response.headers.get("Retry-After", 5))
+        return 0.0 if error.status >= 500 else None
+    if isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError, OSError)):
+        return 0.0
+    return None
+
+
+class Broadcaster:
+    """Delivers broadcasts guild by guild from Redis, so a restart picks up where the last process stopped.
+
+    `create` stores the message parts and one channel per guild, all due now.
+    `deliver_due(send)` leases due guilds and sends each remaining part with
+    `send(channel_id, part)`, at most `rate` sends per second across all
+    guilds. Parts already sent are remembered, so a retry never repeats them
+    (a process dying mid-send can still repeat the part it was sending).
+    Transient failures back off, up to `max_attempts`; a 429 also pauses
+    every send for its retry-after. Missing channels or permissions fail at once.
+    """
+
+    def __init__(self, r, rate=40.0, concurrency=10, max_attempts=5, lease=120, base_delay=2.0, max_delay=300.0,
+                 ttl=30 * 86400):
+        self.r = r
+        self.rate = rate
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.ttl = ttl
+        self._create = r.register_script(CREATE_SCRIPT)
+        self._claim = r.register_script(CLAIM_SCRIPT)
+        self._gate = asyncio.Semaphore(concurrency)
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+
+    @staticmethod
+    def keys(broadcast_id):
+        base = f"broadcast:{broadcast_id}"
+        return base, f"{base}:targets", f"{base}:status", f"{base}:due", f"{base}:progress", f"{base}:attempts"
+
+    async def register_channel(self, kind, guild_id, channel_id):
+        await self.r.hset(f"broadcast:channels:{kind}", str(guild_id), str(channel_id))
+
+    async def channels(self, kind):
+        """Guild -> channel for `kind` ("version", "announcement"), backfilled once from `channel:{kind}:*`."""
+        index = f"broadcast:channels:{kind}"
+
+        async def write(keys, values):
+            mapping = {key.rsplit(":", 1)[1]: value for key, value in zip(keys, values) if value}
+            if mapping:
+                await self.r.hset(index, mapping=mapping)
+
+        await backfill_index(self.r, index, f"channel:{kind}:*", write)
+        return await self.r.hgetall(index)
+
+    async def create(self, broadcast_id, parts, targets):
+        """Queue `parts` (dicts with "content" and/or "embed") for `targets` {guild: channel}. False if it exists."""
+        if not targets:
+            return False
+        base, target_key, status, due, _, _ = self.keys(broadcast_id)
+        args = [broadcast_id, json.dumps(parts), int(time.time()), time.time()]
+        for guild_id, channel_id in targets.items():
+            args += [str(guild_id), str(channel_id)]
+        return bool(await self._create(keys=[base, target_key, status, due, ACTIVE], args=args))
+
+    async def deliver_due(self, send, batch=100, renew=None):
+        """Deliver everything due now; returns how many guilds got their broadcast this round.
+
+        `renew()` is awaited before each batch; when it returns False (say, a
+        leader lease was lost) the round stops, and what it leased goes back
+        to the due set when the lease runs out, for whoever holds the lease now.
+        """
+        delivered = 0
+        for broadcast_id in sorted(await self.r.smembers(ACTIVE)):
+            while True:
+                if renew and not await renew():
+                    return delivered
+                claimed = await self._claim_batch(broadcast_id, batch)
+                results = await asyncio.gather(*(self._deliver(delivery, send) for delivery in claimed))
+                delivered += sum(results)
+                if len(claimed) < batch:
+                    break
+            await self._finish_if_done(broadcast_id)
+        return delivered
+
+    async def _claim_batch(self, broadcast_id, count):
+        base, targets, _, due, progress, attempts = self.keys(broadcast_id)
+        guilds = await self._claim(keys=[due], args=[time.time(), self.lease, count])
+        if not guilds:
+            return []
+        async with self.r.pipeline(transaction=False) as pipe:
+            pipe.hget(base, "parts")
+            pipe.hmget(targets, guilds)
+            pipe.hmget(progress, guilds)
+            pipe.hmget(attempts, guilds)
+            parts, channels, done, tries = await pipe.execute()
+        parts = json.loads(parts or "[]")
+        return [
+            Delivery(broadcast_id, guild_id, channel_id, parts, int(sent or 0), int(tried or 0))
+            for guild_id, channel_id, sent, tried in zip(guilds, channels, done, tries)
+        ]
+
+    async def _deliver(self, delivery, send):
+        _, _, status, due, progress, _ = self.keys(delivery.broadcast_id)
+        async with self._gate:
+            done = delivery.done
+            for part in delivery.parts[done:]:
+                await self._pace()
+                try:
+                    await send(delivery.channel_id, part)
+                except Exception as e:
+                    await self._failed(delivery, e)
+                    return False
+                done += 1
+                await self.r.hset(progress, delivery.guild_id, done)
+        async with self.r.pipeline(transaction=True) as pipe:
+            pipe.hset(status, delivery.guild_id, "sent")
+            pipe.zrem(due, delivery.guild_id)
+            await pipe.execute()
+        return True
+
+    async def _failed(self, delivery, error):
+        _, _, status, due, _, attempts = self.keys(delivery.broadcast_id)
+        delay = retry_delay(error)
+        if isinstance(error, (discord.RateLimited, discord.HTTPException)) and delay:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)  # Back off everyone, not just us
+        tries = delivery.attempts + 1
+        async with self.r.pipeline(transaction=True) as pipe:
+            pipe.hset(attempts, delivery.guild_id, tries)
+            if delay is None or tries >= self.max_attempts:
+                pipe.hset(status, delivery.guild_id, f"failed: {error}"[:200])
+                pipe.zrem(due, delivery.guild_id)
+            else:
+                backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** tries))
+                pipe.hset(status, delivery.guild_id, f"retrying: {error}"[:200])
+                pipe.zadd(due, {delivery.guild_id: time.time() + max(delay, backoff)})
+            await pipe.execute()
+
+    async def _pace(self):
+        # One shared pacer: a 429 pause applies to every send in flight, then sends resume `rate` per second
+        while True:
+            now = time.monotonic()
+            if self._paused_until <= now:
+                break
+            await asyncio.sleep(self._paused_until - now)
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + 1 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _finish_if_done(self, broadcast_id):
+        keys = self.keys(broadcast_id)
+        if await self.r.zcard(keys[3]):
+            return
+        async with self.r.pipeline(transaction=True) as pipe:
+            pipe.srem(ACTIVE, broadcast_id)
+            for key in keys:
+                pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def summary(self, broadcast_id):
+        """Counts per status ("pending", "sent", "retrying", "failed") plus the failure reasons, or None."""
+        base, _, status, _, _, _ = self.keys(broadcast_id)
+        total = await self.r.hget(base, "total")
+        if total is None:
+            return None
+        statuses = await self.r.hgetall(status)
+        counts = Counter(value.split(":", 1)[0] for value in statuses.values())
+        failures = {
+            guild: value.split(":", 1)[1].strip() for guild, value in statuses.items() if value.startswith("failed")
+        }
+        return {"total": int(total), "counts": dict(counts), "failures": failures}
@@ -0,0 +1,166 @@
+# 📚 BeeBot content — facts, jokes, quiz and other corpora parsed once into typed records
+import hashlib
+import json
+import os
+import random
+import re
+from collections import namedtuple
+
+import redis.asyncio as aioredis
+
+from hot_reload import FileWatcher
+
+QuizItem = namedtuple("QuizItem", "question choices answer")  # choices: ((letter, text), ...)
+
+
+def parse_lines(text):
+    """One record per non-blank line."""
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+QUIZ_CHOICE = re.compile(r"^([A-Z])[).:]\s*(.+)$")
+QUIZ_ANSWER = re.compile(r"^ANSWER:\s*\|*\s*([A-Z])\s*\|*", re.IGNORECASE)
+
+
+def parse_quiz(text):
+    """Blocks of `QUESTION: ...`, `A) ...` choices and `ANSWER: ||X||`.
+
+    Older single-line `question|a|b|c|answer` entries are read too.
+    Blocks missing a question, choices or a valid answer are skipped.
+    """
+    items = []
+    question, choices, answer = None, [], None
+
+    def flush():
+        if question and choices and answer in dict(choices):
+            items.append(QuizItem(question, tuple(choices), answer))
+
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.upper().startswith("QUESTION:"):
+            flush()
+            question, choices, answer = line[len("QUESTION:"):].strip(), [], None
+        elif "|" in line and not line.upper().startswith("ANSWER:"):
+            flush()
+            parts = [part.strip() for part in line.split("|")]
+            letters = [chr(ord("A") + index) for index in range(len(parts) - 2)]
+            question, choices = parts[0], list(zip(letters, parts[1:-1]))
+            answer = parts[-1].upper() if len(parts) >= 4 else None
+        elif QUIZ_CHOICE.match(line) and question:
+            choices.append(QUIZ_CHOICE.match(line).groups())
+        elif QUIZ_ANSWER.match(line):
+            answer = QUIZ_ANSWER.match(line).group(1).upper()
+    flush()
+    return items
+
+
+PARSERS = {"lines": parse_lines, "quiz": parse_quiz}
+RECORD_DECODERS = {  # JSON index rows back into typed records
+    "quiz": lambda row: QuizItem(row[0], tuple(tuple(choice) for choice in row[1]), row[2]),
+}
+INDEX_VERSION = 1  # Bump when a parser changes so old index files are ignored
+
+# 🃏 Refill a scope's deck with a fresh shuffle only if it is still empty (a racing caller may have done it)
+#   KEYS: deck
+#   ARGV: ttl, shuffled indexes...
+REFILL_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    for i = 2, #ARGV, 1000 do
+        redis.call('RPUSH', KEYS[1], unpack(ARGV, i, math.min(i + 999, #ARGV)))
+    end
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return redis.call('LPOP', KEYS[1])
+"""
+
+
+class ContentStore:
+    """Parsed corpora served from memory, with no-repeat picks per channel.
+
+    Each file is parsed once and the records are written to
+    `{cache_dir}/{name}-{sha256}.json`, so a restart with unchanged files
+    skips parsing. `get()` re-stats a file at most every `check_interval`
+    seconds and reloads it when it changes. `pick()` deals records from a
+    shuffled deck kept in Redis per scope (e.g. a channel), so nothing
+    repeats until the whole corpus has been seen.
+    """
+
+    def __init__(self, r, corpora, cache_dir=".content_cache", check_interval=5.0, deck_ttl=30 * 86400):
+        self.r = r
+        self.corpora = dict(corpora)  # name -> (file path, parser kind)
+        self.cache_dir = cache_dir
+        self.watcher = FileWatcher(check_interval)
+        self.deck_ttl = deck_ttl
+        self._records = {}
+        self._digests = {}
+        self._refill = r.register_script(REFILL_SCRIPT)
+        for name in self.corpora:
+            self.reload(name)
+
+    def reload(self, name=None):
+        """Force a reload of one corpus (or all of them when `name` is None)."""
+        for corpus in ([name] if name else list(self.corpora)):
+            path, kind = self.corpora[corpus]
+            try:
+                with open(path, "rb") as f:
+                    raw = f.read()
+            except OSError:
+                raw = b""
+            digest = hashlib.sha256(raw).hexdigest()
+            if digest != self._digests.get(corpus):
+                self._records[corpus] = self._load_index(corpus, kind, raw, digest)
+                self._digests[corpus] = digest
+            self.watcher.loaded(corpus, path)
+
+    def _load_index(self, name, kind, raw, digest):
+        index_path = os.path.join(self.cache_dir, f"{name}-{digest[:16]}.v{INDEX_VERSION}.json")
+        decode = RECORD_DECODERS.get(kind)
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+            return [decode(row) for row in records] if decode else records
+        except (OSError, ValueError, TypeError, IndexError):
+            pass
+
+        records = PARSERS[kind](raw.decode("utf-8", errors="replace"))
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            own_index = re.compile(rf"{re.escape(name)}-[0-9a-f]{{16}}\.v\d+\.json")
+            for stale in os.listdir(self.cache_dir):
+                if own_index.fullmatch(stale):
+                    os.remove(os.path.join(self.cache_dir, stale))
+            temp_path = f"{index_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(records, f, ensure_ascii=False)
+            os.replace(temp_path, index_path)
+        except OSError:
+            pass  # A read-only disk only costs a reparse next start
+        return records
+
+    def get(self, name):
+        if self.watcher.changed(name, self.corpora[name][0]):
+            self.reload(name)
+        return self._records[name]
+
+    def random(self, name):
+        records = self.get(name)
+        return random.choice(records) if records else None
+
+    async def pick(self, name, scope):
+        """Next record from `scope`'s shuffled deck; falls back to a plain random pick if Redis is down."""
+        records = self.get(name)
+        if not records:
+            return None
+        deck = f"content:deck:{name}:{self._digests[name][:12]}:{scope}"
+        try:
+            index = await self.r.lpop(deck)
+            if index is None:
+                order = list(range(len(records)))
+                random.shuffle(order)
+                index = await self._refill(keys=[deck], args=[self.deck_ttl, *order])
+        except aioredis.RedisError:
+            return random.choice(records)
+        index = int(index)
+        return records[index] if index < len(records) else random.choice(records)
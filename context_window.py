@@ -0,0 +1,90 @@
+# 🧵 BeeBot context window — token-budgeted history with a rolling summary
+import json
+import math
+import re
+
+from background import TaskSet
+
+# 🔢 Local token estimate (no tokenizer download, no network): words split into
+# ~4-character pieces plus one token per punctuation mark, close to GPT BPE counts for chat text
+TOKEN_PIECE = re.compile(r"\w+|[^\w\s]")
+
+
+def count_tokens(text):
+    return sum(math.ceil(len(piece) / 4) for piece in TOKEN_PIECE.findall(text))
+
+
+# 📦 Turns are stored as small JSON objects; older plain strings are user messages
+def encode_turn(role, content):
+    return json.dumps({"role": role, "content": content}, ensure_ascii=False)
+
+
+def decode_turn(raw):
+    if raw.startswith("{"):
+        try:
+            turn = json.loads(raw)
+            return turn["role"], turn["content"]
+        except (ValueError, KeyError, TypeError):
+            pass
+    return "user", raw
+
+
+def fit_to_budget(turns, budget):
+    """Split newest-first `turns` into (kept, overflow) so kept fits in `budget` tokens."""
+    used = 0
+    for index, (_, content) in enumerate(turns):
+        used += count_tokens(content) + 4  # Role label and line break
+        if used > budget:
+            return turns[:index], turns[index:]
+    return turns, []
+
+
+def render_context(turns, summary=None):
+    """Oldest-first prompt lines for newest-first `turns`, led by the summary if any."""
+    lines = [f"Earlier in this conversation: {summary}"] if summary else []
+    for role, content in reversed(turns):
+        lines.append(f"{'BeeBot' if role == 'assistant' else 'User'} said: {content}")
+    return "\n".join(lines)
+
+
+class ContextSummarizer:
+    """Folds turns that no longer fit the token budget into a rolling summary.
+
+    Runs in the background after a reply, at most once at a time per
+    conversation. `summarize(previous_summary, turns, guild_id)` does the
+    model call (turns newest-first, like everywhere else here);
+    `store.fold_summary` saves the new summary and drops the folded turns.
+    """
+
+    def __init__(self, store, summarize, budget, on_error=None):
+        self.store = store
+        self.summarize = summarize
+        self.budget = budget
+        self.on_error = on_error
+        self._running = set()
+        self._tasks = TaskSet()
+
+    def schedule(self, user_id, thread_id, guild_id=None):
+        key = (user_id, thread_id)
+        if key in self._running:
+            return
+        self._running.add(key)
+        self._tasks.spawn(self._fold(key, guild_id))
+
+    async def _fold(self, key, guild_id):
+        user_id, thread_id = key
+        try:
+            raw, summary = await self.store.get_turns_and_summary(user_id, thread_id)
+            turns = [decode_turn(entry) for entry in raw]
+            budget = self.budget - (count_tokens(summary) if summary else 0)
+            _, overflow = fit_to_budget(turns, max(budget, 0))
+            if not overflow:
+                return
+            new_summary = await self.summarize(summary, overflow, guild_id)
+            if new_summary:
+                await self.store.fold_summary(user_id, thread_id, new_summary.strip(), len(overflow))
+        except Exception as e:
+            if self.on_error:
+                self.on_error(key, e)
+        finally:
+            self._running.discard(key)
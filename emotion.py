@@ -0,0 +1,83 @@
+# 🧠 BeeBot emotion detection — one compiled pass over the message
+import re
+from collections import namedtuple
+
+from matching import trie_pattern
+
+# 🧠 Emotion keywords (multi-word phrases are fine)
+EMOTION_MAP = {
+    "sad": ["sad", "upset", "cry", "lonely", "depressed", "blue", "down", "hurt", "heartbroken",
+            "grieving", "mourning", "bummed", "melancholy", "despair"],
+    "happy": ["happy", "joy", "excited", "smile", "glad", "cheerful", "grateful", "content", "glee",
+              "thrilled", "blissful"],
+    "angry": ["angry", "mad", "furious", "annoyed", "frustrated", "irritated", "resentful",
+              "fuming", "snappy", "rage"],
+    "anxious": ["worried", "anxious", "scared", "nervous", "panicked", "overwhelmed", "afraid",
+                "tense", "shaky", "on edge", "dizzy", "racing", "uneasy"],
+    "ashamed": ["ashamed", "guilty", "embarrassed", "regret", "sorry", "disgusted with myself",
+                "worthless", "cringe", "mortified"],
+    "rejected": ["ignored", "unwanted", "rejected", "abandoned", "invisible", "left out", "unloved",
+                 "uncared for", "dismissed", "neglected"],
+    "tired": ["tired", "exhausted", "worn out", "drained", "burnt out", "sleepy", "drowsy",
+              "sluggish", "fatigued"],
+    "neutral": ["fine", "okay", "meh", "whatever", "shrug", "idk", "neutral"]
+}
+
+# ⚖️ "fine" shouldn't outweigh "sad" in "I'm fine, just sad"
+EMOTION_WEIGHTS = {"neutral": 0.5}
+
+# Endings the old substring scan caught ("joyful", "sadness"), spelled out so "blueberry" still doesn't count
+ENDINGS = ("s", "ed", "ing", "er", "est", "ly", "ness", "ful")
+
+EmotionResult = namedtuple("EmotionResult", "emotion confidence scores")
+
+
+def inflections(word):
+    """`word` and its common inflections: cry -> cries/cried, rage -> raging, sad -> sadder, joy -> joyful."""
+    forms = {word} | {word + ending for ending in ENDINGS}
+    if word.endswith("e"):
+        forms |= {word[:-1] + ending for ending in ("es", "ed", "ing", "er", "est")}
+    elif len(word) > 2 and word[-1] == "y" and word[-2] not in "aeiou":
+        forms |= {word[:-1] + ending for ending in ("ies", "ied", "ier", "iest", "ily", "iness")}
+    elif re.fullmatch(r".*[^aeiou][aeiou][^aeiouwxy]", word):
+        forms |= {word + word[-1] + ending for ending in ("ed", "ing", "er", "est")}
+    return forms
+
+
+class EmotionDetector:
+    """Scores every emotion in a single regex pass over the message.
+
+    Keywords (and their inflections, on the last word of a phrase) match on
+    word boundaries; a multi-word phrase counts once per word it spans, so
+    "burnt out" outweighs a stray "down". The highest total wins, with ties
+    going to the emotion listed first in the map.
+    """
+
+    def __init__(self, emotion_map=EMOTION_MAP, weights=EMOTION_WEIGHTS):
+        self.order = list(emotion_map)
+        self.lookup = {}
+        keywords = [
+            (" ".join(keyword.lower().split()), emotion) for emotion, words in emotion_map.items() for keyword in words
+        ]
+        for phrase, emotion in keywords:
+            self.lookup.setdefault(phrase, (emotion, weights.get(emotion, 1.0) * len(phrase.split())))
+        for phrase, emotion in keywords:  # After every exact keyword, so an inflection never takes one over
+            *head, last = phrase.split()
+            for form in inflections(last):
+                self.lookup.setdefault(" ".join(head + [form]), self.lookup[phrase])
+        # Matching a lowercased copy is ~3x faster than re.IGNORECASE
+        self.pattern = re.compile(r"\b(" + trie_pattern(self.lookup) + r")\b")
+
+    def scores(self, message):
+        totals = {}
+        for keyword in self.pattern.findall(message.lower()):
+            emotion, weight = self.lookup[" ".join(keyword.split())]
+            totals[emotion] = totals.get(emotion, 0.0) + weight
+        return totals
+
+    def detect(self, message):
+        totals = self.scores(message)
+        if not totals:
+            return EmotionResult("neutral", 0.0, totals)
+        best = max(totals, key=lambda emotion: (totals[emotion], -self.order.index(emotion)))
+        return EmotionResult(best, totals[best] / sum(totals.values()), totals)
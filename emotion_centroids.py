@@ -0,0 +1,165 @@
+# 🧭 BeeBot centroid emotion classifier — hashed n-gram embeddings scored against per-emotion centroids
+# Local and CPU-only: no model download, no network. Needs NumPy; without it BeeBot keeps the keyword detector.
+import asyncio
+import hashlib
+import re
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+
+from emotion import EmotionResult
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency
+    np = None
+
+WORD = re.compile(r"[a-z']+|[!?]")
+NEGATIONS = {"not", "no", "never", "don't", "dont", "can't", "cant", "isn't", "wasn't", "won't", "nothing"}
+
+
+def available():
+    return np is not None
+
+
+def _hash(token):
+    return zlib.crc32(token.encode("utf-8"))
+
+
+@lru_cache(maxsize=65536)
+def _word_grams(word):
+    # Character 3–4-grams of one word, hashed; chat reuses the same words constantly
+    padded = f"<{word}>"
+    return tuple(_hash(padded[i:i + size]) for size in (3, 4) for i in range(len(padded) - size + 1))
+
+
+def features(text):
+    """Hashed words (negation-marked), word pairs and in-word character 3–4-grams."""
+    words = WORD.findall(text.lower())
+    hashed = []
+    negated = False
+    for word in words:
+        hashed += _word_grams(word)
+        if word in NEGATIONS:
+            negated = True
+            hashed.append(_hash(word))
+            continue
+        hashed.append(_hash(f"not_{word}" if negated else word))
+        negated = negated and word not in ("!", "?")
+    hashed += [_hash(f"{first} {second}") for first, second in zip(words, words[1:])]
+    return hashed
+
+
+def load_examples(path):
+    """`emotion|message` lines (`#` comments allowed) -> [(emotion, message), ...]."""
+    examples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#") and "|" in line:
+                emotion, message = line.split("|", 1)
+                examples.append((emotion.strip(), message.strip()))
+    return examples
+
+
+class CentroidClassifier:
+    """Cosine similarity between a message's hashed embedding and each emotion's mean example.
+
+    `classify_many` scores a whole batch with one matrix product. Results are
+    cached by message hash. A best similarity under `min_similarity` counts
+    as neutral.
+    """
+
+    def __init__(self, examples, dimensions=4096, min_similarity=0.12, cache_size=10000):
+        if np is None:
+            raise RuntimeError("The centroid emotion classifier needs NumPy")
+        self.dimensions = dimensions
+        self.min_similarity = min_similarity
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.emotions = sorted({emotion for emotion, _ in examples})
+        vectors = self._embed([message for _, message in examples])
+        labels = np.array([self.emotions.index(emotion) for emotion, _ in examples])
+        centroids = np.stack([vectors[labels == index].mean(axis=0) for index in range(len(self.emotions))])
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        self.centroids = (centroids / np.maximum(norms, 1e-9)).T.astype(np.float32)  # dimensions x emotions
+
+    def _embed(self, texts):
+        rows, columns = [], []
+        for row, text in enumerate(texts):
+            hashed = features(text)
+            rows += [row] * len(hashed)
+            columns += hashed
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        np.add.at(matrix, (np.array(rows, dtype=np.intp), np.array(columns, dtype=np.int64) % self.dimensions), 1.0)
+        np.sqrt(matrix, out=matrix)  # Dampen repeated n-grams
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-9)
+
+    def classify_many(self, texts):
+        results = [None] * len(texts)
+        keys = [hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest() for text in texts]
+        todo = []
+        for index, key in enumerate(keys):
+            cached = self._cache.get(key)
+            if cached:
+                self._cache.move_to_end(key)
+                results[index] = cached
+            else:
+                todo.append(index)
+
+        if todo:
+            similarities = self._embed([texts[index] for index in todo]) @ self.centroids
+            for index, row in zip(todo, similarities):
+                best = int(row.argmax())
+                scores = {emotion: float(score) for emotion, score in zip(self.emotions, row)}
+                if row[best] < self.min_similarity:
+                    result = EmotionResult("neutral", 0.0, scores)
+                else:
+                    result = EmotionResult(self.emotions[best], float(row[best]), scores)
+                results[index] = result
+                self._cache[keys[index]] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return results
+
+    def classify(self, text):
+        return self.classify_many([text])[0]
+
+
+class EmotionBatcher:
+    """Collects messages arriving within `window` seconds and classifies them in one batch."""
+
+    def __init__(self, classifier, window=0.005, max_batch=64):
+        self.classifier = classifier
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = []
+        self._timer = None
+
+    async def classify(self, text):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        try:
+            results = self.classifier.classify_many([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,127 @@
+# 🚪 BeeBot gatekeeper — decide from memory whether a gateway message deserves any work at all
+# Autoreply channels and consenting users are mirrored into small Redis indexes (a hash and a set) so a
+# replica can load them in a few round trips at startup instead of scanning the keyspace.
+import hashlib
+import math
+import time
+
+from background import TaskSet
+from storage import backfill_index
+
+CHANNEL_INDEX = "index:autoreply"  # hash: channel id -> "on" / "off" (explicit settings only)
+CONSENT_INDEX = "index:consent"  # set: user ids with consent "on"
+
+
+class BloomFilter:
+    """Fixed-size set membership with false positives but no false negatives."""
+
+    def __init__(self, capacity=1_000_000, error_rate=0.01):
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(str(item).encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * step) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class Gatekeeper:
+    """Answers "is this channel live?" and "could this user have consented?" without touching Redis.
+
+    A "no" from `may_have_consented` is certain; a "yes" still goes through
+    the real consent check. Revoked consent stays in the filter (harmless)
+    until the next reload. `should_nag` limits the /consent reminder to once
+    per user per `nag_cooldown` seconds across every replica.
+    """
+
+    def __init__(self, r, consent_capacity=1_000_000, nag_cooldown=86400, on_error=None):
+        self.r = r
+        self.consent_capacity = consent_capacity
+        self.nag_cooldown = nag_cooldown
+        self.on_error = on_error
+        self.channels = {}
+        self.consent = BloomFilter(consent_capacity)
+        self._nagged = {}  # user id -> when our local copy of the cooldown ends
+        self._reloading = None
+        self._tasks = TaskSet()
+
+    async def load(self):
+        await backfill_index(self.r, CHANNEL_INDEX, "autoreply:*", self._index_channels)
+        await backfill_index(self.r, CONSENT_INDEX, "consent:*", self._index_consents)
+        channels = await self.r.hgetall(CHANNEL_INDEX)
+        consent = BloomFilter(self.consent_capacity)
+        async for user_id in self.r.sscan_iter(CONSENT_INDEX, count=5000):
+            consent.add(user_id)
+        self.channels, self.consent = channels, consent
+        return len(channels)
+
+    async def _index_channels(self, keys, values):
+        mapping = {key.split(":", 1)[1]: value for key, value in zip(keys, values) if value in ("on", "off")}
+        if mapping:
+            await self.r.hset(CHANNEL_INDEX, mapping=mapping)
+
+    async def _index_consents(self, keys, values):
+        user_ids = [key.split(":", 1)[1] for key, value in zip(keys, values) if value == "on"]
+        if user_ids:
+            await self.r.sadd(CONSENT_INDEX, *user_ids)
+
+    def active(self, channel_id, is_thread=False):
+        mode = self.channels.get(str(channel_id))
+        return mode == "on" or (mode is None and is_thread)
+
+    def may_have_consented(self, user_id):
+        return str(user_id) in self.consent
+
+    async def set_autoreply(self, channel_id, mode):
+        self.channels[str(channel_id)] = mode
+        await self.r.hset(CHANNEL_INDEX, str(channel_id), mode)
+
+    async def set_consent(self, user_id, mode):
+        if mode == "on":
+            self.consent.add(str(user_id))
+            await self.r.sadd(CONSENT_INDEX, str(user_id))
+        else:
+            await self.r.srem(CONSENT_INDEX, str(user_id))
+
+    async def should_nag(self, user_id):
+        now = time.monotonic()
+        if self._nagged.get(user_id, 0) > now:
+            return False
+        if len(self._nagged) > 100000:
+            self._nagged = {user: until for user, until in self._nagged.items() if until > now}
+        self._nagged[user_id] = now + self.nag_cooldown
+        return bool(await self.r.set(f"consent:nagged:{user_id}", 1, nx=True, ex=self.nag_cooldown))
+
+    def changed(self, key):
+        """Settings-feed hook: another replica changed `key` (None: we may have missed changes)."""
+        if key is None:
+            if self._reloading is None or self._reloading.done():
+                self._reloading = self._tasks.spawn(self._guarded(self.load()))
+        elif key.startswith("autoreply:"):
+            self._tasks.spawn(self._guarded(self._refresh_channel(key)))
+        elif key.startswith("consent:"):
+            self.consent.add(key.split(":", 1)[1])  # Harmless if it was a revocation
+
+    async def _refresh_channel(self, key):
+        value = await self.r.get(key)
+        channel_id = key.split(":", 1)[1]
+        if value in ("on", "off"):
+            self.channels[channel_id] = value
+        else:
+            self.channels.pop(channel_id, None)
+
+    async def _guarded(self, coro):
+        try:
+            await coro
+        except Exception as e:
+            if self.on_error:
+                self.on_error(e)
@@ -0,0 +1,34 @@
+# ♻️ BeeBot hot reload — notice edited files on disk without stat-ing them on every read
+import os
+import time
+
+
+def mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class FileWatcher:
+    """Remembers each watched file's mtime as of its last load.
+
+    `changed(name, path)` re-stats the file at most every `check_interval`
+    seconds per name and says whether it differs from what `loaded` recorded.
+    """
+
+    def __init__(self, check_interval=5.0):
+        self.check_interval = check_interval
+        self._mtimes = {}
+        self._checked_at = {}
+
+    def loaded(self, name, path):
+        self._mtimes[name] = mtime(path)
+        self._checked_at[name] = time.monotonic()
+
+    def changed(self, name, path):
+        now = time.monotonic()
+        if now - self._checked_at.get(name, 0) < self.check_interval:
+            return False
+        self._checked_at[name] = now
+        return mtime(path) != self._mtimes.get(name)
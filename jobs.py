@@ -0,0 +1,82 @@
+# 📬 BeeBot job queue — AI replies handed from the gateway to worker processes over a Redis Stream
+import json
+from collections import namedtuple
+
+import redis.asyncio as aioredis
+
+# 📦 One claimed job: stream entry id, its fields and how many times it has been tried
+Job = namedtuple("Job", "id fields attempts")
+
+
+class JobQueue:
+    """A Redis Stream with a consumer group, so every job goes to exactly one worker.
+
+    Workers ack a job once its reply is delivered. A job that fails is put
+    back with its attempt count bumped, up to `max_attempts`, then parked in
+    `{stream}:dead`. A job whose worker died is picked up by another worker
+    after sitting unacknowledged for `claim_idle` seconds.
+    """
+
+    def __init__(self, r, stream="jobs:ai", group="ai-workers", max_attempts=3, claim_idle=60, maxlen=10000):
+        self.r = r
+        self.stream = stream
+        self.group = group
+        self.max_attempts = max_attempts
+        self.claim_idle = claim_idle
+        self.maxlen = maxlen
+
+    async def ensure_group(self):
+        try:
+            await self.r.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except aioredis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def enqueue(self, attempts=0, **fields):
+        """Add a job; values are JSON-encoded so ints and None survive the trip."""
+        entry = {key: json.dumps(value) for key, value in fields.items()}
+        entry["attempts"] = attempts
+        return await self.r.xadd(self.stream, entry, maxlen=self.maxlen, approximate=True)
+
+    async def claim(self, consumer, count=10, block=5.0):
+        """Up to `count` jobs for `consumer`: abandoned ones first, then new ones (waiting up to `block` s)."""
+        _, stale, _ = await self.r.xautoclaim(
+            self.stream, self.group, consumer, min_idle_time=int(self.claim_idle * 1000), start_id="0-0", count=count
+        )
+        entries = list(stale)
+        if len(entries) < count:
+            response = await self.r.xreadgroup(
+                self.group, consumer, {self.stream: ">"}, count=count - len(entries), block=int(block * 1000)
+            )
+            for _, stream_entries in response or []:
+                entries.extend(stream_entries)
+        return [self._job(entry_id, entry) for entry_id, entry in entries if entry]
+
+    async def ack(self, job):
+        async with self.r.pipeline(transaction=True) as pipe:
+            pipe.xack(self.stream, self.group, job.id)
+            pipe.xdel(self.stream, job.id)
+            await pipe.execute()
+
+    async def retry(self, job, error=None):
+        """Requeue a failed job, or park it in the dead-letter stream after `max_attempts`. True if requeued."""
+        attempts = job.attempts + 1
+        if attempts < self.max_attempts:
+            await self.enqueue(attempts=attempts, **job.fields)
+            requeued = True
+        else:
+            dead = {key: json.dumps(value) for key, value in job.fields.items()}
+            dead.update(attempts=attempts, error=str(error or "")[:500])
+            await self.r.xadd(f"{self.stream}:dead", dead, maxlen=self.maxlen, approximate=True)
+            requeued = False
+        await self.ack(job)
+        return requeued
+
+    async def backlog(self):
+        """Jobs not yet acknowledged (waiting or in progress); acked jobs are deleted from the stream."""
+        return await self.r.xlen(self.stream)
+
+    @staticmethod
+    def _job(entry_id, entry):
+        attempts = int(entry.pop("attempts", 0))
+        return Job(id=entry_id, fields={key: json.loads(value) for key, value in entry.items()}, attempts=attempts)
@@ -0,0 +1,37 @@
+# 🔎 BeeBot phrase matching — compile many phrases into one trie-shaped regex
+import re
+
+
+def _escape(char):
+    # Runs of whitespace inside phrases match any whitespace ("on  edge", "on\nedge")
+    return r"\s+" if char == " " else re.escape(char)
+
+
+def _trie_regex(node):
+    # 🌳 Each alternative starts with a distinct character, so the regex engine
+    # never tries more than one branch per position
+    branches = []
+    for char in sorted(key for key in node if key):
+        branches.append(_escape(char) + _trie_regex(node[char]))
+    if not branches:
+        return ""
+
+    pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:  # A shorter phrase ends here, so the rest is optional
+        pattern = "(?:" + pattern + ")?"
+    return pattern
+
+
+def trie_pattern(phrases):
+    """Regex source matching any of `phrases`, shaped as a trie so matching cost
+    depends on text length, not on how many phrases there are."""
+    trie = {}
+    for phrase in phrases:
+        phrase = " ".join(phrase.split())
+        if not phrase:
+            continue
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = True
+    return _trie_regex(trie) if trie else r"(?!)"
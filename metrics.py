@@ -0,0 +1,126 @@
+# 📊 BeeBot metrics — in-process histograms, counters and gauges with a Prometheus text endpoint
+import asyncio
+import bisect
+import time
+from contextlib import contextmanager
+
+# ⏱️ Latency buckets in seconds, 1 ms up to 60 s
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram; quantiles are interpolated within a bucket like Prometheus does."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                if index == len(self.buckets):
+                    return self.buckets[-1]  # Beyond the last bucket: report its bound
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class Metrics:
+    """Registry keyed by metric name plus a sorted tuple of label pairs."""
+
+    def __init__(self, namespace="beebot"):
+        self.namespace = namespace
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}  # name -> zero-argument callable
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(value)
+
+    @contextmanager
+    def time(self, name, **labels):
+        """Time a block (awaits inside included) into histogram `name`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name, read):
+        self.gauges[name] = read
+
+    def counter_value(self, name, **labels):
+        return self.counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def render(self):
+        """Prometheus text exposition format."""
+        lines = []
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            full = f"{self.namespace}_{name}"
+            cumulative = 0
+            for bound, count in zip(self._bucket_labels(histogram), histogram.counts):
+                cumulative += count
+                lines.append(f"{full}_bucket{_label_text(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{full}_sum{_label_text(labels)} {histogram.sum}")
+            lines.append(f"{full}_count{_label_text(labels)} {histogram.count}")
+        for (name, labels), value in sorted(self.counters.items()):
+            lines.append(f"{self.namespace}_{name}{_label_text(labels)} {value}")
+        for name, read in sorted(self.gauges.items()):
+            try:
+                lines.append(f"{self.namespace}_{name} {float(read())}")
+            except Exception:
+                continue  # A broken gauge shouldn't take the endpoint down
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _bucket_labels(histogram):
+        return [str(bound) for bound in histogram.buckets] + ["+Inf"]
+
+    async def serve(self, host, port):
+        """Serve `render()` over plain HTTP for Prometheus scrapes."""
+
+        async def handle(reader, writer):
+            try:
+                await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=5)
+                body = self.render().encode("utf-8")
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                    + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("ascii")
+                    + body
+                )
+                await writer.drain()
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                pass
+            finally:
+                writer.close()
+
+        return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,50 @@
+# 🚫 BeeBot moderation — banned phrases compiled once into a single matcher
+import re
+
+from matching import trie_pattern
+
+# Curly quotes/apostrophes folded to plain ones so "You’re" matches "You're"
+QUOTE_TABLE = str.maketrans({"’": "'", "‘": "'", "“": '"', "”": '"'})
+
+# Decorations used in banned_phrases.txt: ✖️ bullets and the quotes around each phrase
+PHRASE_DECORATION = "✖️\"' \t"
+PHRASE_TRAILING = ".!?,;:" + PHRASE_DECORATION
+
+
+def normalize_text(text):
+    """Lowercase, fold curly quotes and collapse whitespace."""
+    return " ".join(text.translate(QUOTE_TABLE).lower().split())
+
+
+def clean_phrase(line):
+    """Turn a line like `✖️ "Calm down."` into `calm down`."""
+    phrase = normalize_text(line).strip(PHRASE_DECORATION).rstrip(PHRASE_TRAILING)
+    return phrase.strip()
+
+
+class PhraseFilter:
+    """Finds banned phrases in a single pass, whatever the size of the list.
+
+    Phrases are normalized once and compiled into one trie-shaped regex that
+    only matches on word edges ("calm down" matches "please calm down!" but
+    "mad" wouldn't match "made"). Single-word entries like "Whatever." are
+    dismissive only as a whole reply, so they match only the whole text.
+    """
+
+    def __init__(self, lines):
+        self.phrases = sorted({phrase for phrase in map(clean_phrase, lines) if phrase})
+        self.whole = {phrase for phrase in self.phrases if len(phrase.split()) == 1}
+        multiword = [phrase for phrase in self.phrases if phrase not in self.whole]
+        self.pattern = re.compile(r"(?<!\w)(?:" + trie_pattern(multiword) + r")(?!\w)") if multiword else None
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def find(self, text):
+        """Return the first banned phrase found in `text`, or None."""
+        text = normalize_text(text)
+        whole = text.strip(PHRASE_TRAILING)
+        if whole in self.whole:
+            return whole
+        match = self.pattern.search(text) if self.pattern else None
+        return match.group(0) if match else None
@@ -0,0 +1,55 @@
+# 🧬 BeeBot persona registry — personality files kept in memory, reloaded when edited
+import hashlib
+
+from hot_reload import FileWatcher
+
+
+def _read_file(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().strip()
+
+
+class PersonaRegistry:
+    """Loads each persona file once and serves it from memory.
+
+    `get()` re-stats a file at most every `check_interval` seconds and reloads
+    it when its mtime changes, so operators can edit personas without a restart.
+    Per-guild overrides live in `overrides` (guild id -> persona name) and are
+    filled from Redis at startup, so picking a persona never touches Redis.
+    """
+
+    def __init__(self, files, loader=_read_file, check_interval=5.0):
+        self.files = dict(files)  # persona name -> file path
+        self.loader = loader
+        self.watcher = FileWatcher(check_interval)
+        self.overrides = {}
+        self._texts = {}
+        self._digests = {}
+        for name in self.files:
+            self.reload(name)
+
+    def names(self):
+        return list(self.files)
+
+    def reload(self, name=None):
+        """Force a reload of one persona (or all of them when `name` is None)."""
+        for persona in ([name] if name else list(self.files)):
+            path = self.files[persona]
+            self._texts[persona] = self.loader(path) or ""
+            self._digests[persona] = hashlib.sha1(self._texts[persona].encode("utf-8")).hexdigest()[:12]
+            self.watcher.loaded(persona, path)
+
+    def get(self, name):
+        if self.watcher.changed(name, self.files[name]):
+            self.reload(name)
+        return self._texts[name]
+
+    def digest(self, name):
+        """Short content hash of a persona as last loaded, for cache keys."""
+        return self._digests[name]
+
+    def for_guild(self, guild_id, default):
+        """Persona name to use in a guild, falling back to `default` when no override is set."""
+        if guild_id is None:
+            return default
+        return self.overrides.get(str(guild_id), default)
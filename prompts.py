@@ -0,0 +1,42 @@
+# 🧱 BeeBot prompt builder — a byte-stable prefix first (persona, house rules, tone guide), per-call details last
+# OpenAI reuses cached prompt prefixes of 1024+ tokens, so nothing that changes per call may come before the
+# conversation: the ritual, mood and bee notes all go in the final user message.
+
+HOUSE_RULES = """\
+## How each request is laid out
+Earlier turns of the conversation (if any) come first, then one last user message that starts with bracketed
+details for this reply only:
+[tone] the tone to answer in, and [mood] how the user seems to be feeling.
+[ritual] a short ritual line that sets the mood for this reply.
+[bee notes] facts from BeeBot's own files that may help; prefer them over memory when they fit.
+After the details comes what the user just said; that is the message to answer."""
+
+
+def tone_guide(tone_rituals):
+    lines = ["## Tones", "Each tone, with the ritual lines that go with it:"]
+    for tone in sorted(tone_rituals):
+        lines.append(f"- {tone}: " + " / ".join(tone_rituals[tone]))
+    return "\n".join(lines)
+
+
+class PromptBuilder:
+    """Chat messages whose leading system message is identical for every call with the same persona."""
+
+    def __init__(self, tone_rituals, rules=HOUSE_RULES):
+        self.suffix = f"{rules}\n\n{tone_guide(tone_rituals)}"
+
+    def system(self, persona):
+        return f"{persona}\n\n{self.suffix}"
+
+    def build(self, persona, prompt, tone, emotion, ritual, turns=(), summary=None, notes=()):
+        """`turns` are newest-first (role, content) pairs, as everywhere else in BeeBot."""
+        messages = [{"role": "system", "content": self.system(persona)}]
+        if summary:
+            messages.append({"role": "system", "content": f"Earlier in this conversation: {summary}"})
+        messages += [{"role": role, "content": content} for role, content in reversed(turns)]
+
+        details = [f"[tone] {tone}", f"[mood] {emotion}", f"[ritual] {ritual}"]
+        if notes:
+            details.append("[bee notes]\n" + "\n".join(f"- {note}" for note in notes))
+        messages.append({"role": "user", "content": "\n".join(details) + f"\n\n{prompt}"})
+        return messages
@@ -0,0 +1,104 @@
+# 🧠 BeeBot quiz engine — timed rounds, scoring and streaks, every answer one atomic Redis call
+from collections import namedtuple
+
+QuizResult = namedtuple("QuizResult", "status answer points score streak")  # status: correct, wrong, already, closed
+RoundSummary = namedtuple("RoundSummary", "answer correct wrong first")
+
+# 🐝 Record one answer: at most one per user per round, correct answers score (the first one gets a
+# bonus) and extend the user's streak, wrong answers reset it.
+#   KEYS: round hash, answered set, leaderboard zset, streaks hash, best streak zset
+#   ARGV: user id, choice, points, first-answer bonus
+ANSWER_SCRIPT = """
+local answer = redis.call('HGET', KEYS[1], 'answer')
+if not answer then
+    return {'closed', '', 0, '0', 0}
+end
+if redis.call('SADD', KEYS[2], ARGV[1]) == 0 then
+    return {'already', answer, 0, '0', 0}
+end
+redis.call('PEXPIRE', KEYS[2], math.max(redis.call('PTTL', KEYS[1]), 1000))
+if ARGV[2] ~= answer then
+    redis.call('HINCRBY', KEYS[1], 'wrong', 1)
+    redis.call('HSET', KEYS[4], ARGV[1], 0)
+    return {'wrong', answer, 0, redis.call('ZSCORE', KEYS[3], ARGV[1]) or '0', 0}
+end
+local points = tonumber(ARGV[3])
+if redis.call('HSETNX', KEYS[1], 'first', ARGV[1]) == 1 then
+    points = points + tonumber(ARGV[4])
+end
+redis.call('HINCRBY', KEYS[1], 'correct', 1)
+local score = redis.call('ZINCRBY', KEYS[3], points, ARGV[1])
+local streak = redis.call('HINCRBY', KEYS[4], ARGV[1], 1)
+if streak > tonumber(redis.call('ZSCORE', KEYS[5], ARGV[1]) or 0) then
+    redis.call('ZADD', KEYS[5], streak, ARGV[1])
+end
+return {'correct', answer, points, score, streak}
+"""
+
+# 🏁 Close a round (later clicks get 'closed') and return its tallies
+#   KEYS: round hash
+CLOSE_SCRIPT = """
+local answer = redis.call('HGET', KEYS[1], 'answer')
+redis.call('HDEL', KEYS[1], 'answer')
+return {answer or '', redis.call('HGET', KEYS[1], 'correct') or '0', redis.call('HGET', KEYS[1], 'wrong') or '0',
+        redis.call('HGET', KEYS[1], 'first') or ''}
+"""
+
+
+class QuizEngine:
+    """Quiz rounds and per-guild scores in Redis.
+
+    quiz:round:{id}               hash  answer, correct, wrong, first (expires with the round)
+    quiz:answered:{id}            set   users who already answered this round
+    quiz:leaderboard:{guild}      zset  user -> points
+    quiz:streaks:{guild}          hash  user -> current streak
+    quiz:best_streak:{guild}      zset  user -> best streak
+    """
+
+    def __init__(self, r, points=10, first_bonus=5, grace=60):
+        self.r = r
+        self.points = points
+        self.first_bonus = first_bonus
+        self.grace = grace
+        self._answer = r.register_script(ANSWER_SCRIPT)
+        self._close = r.register_script(CLOSE_SCRIPT)
+
+    async def start(self, item, duration):
+        """Open a round for `item`; returns its id. It closes itself after `duration` (+ grace) seconds."""
+        round_id = str(await self.r.incr("quiz:next_id"))
+        async with self.r.pipeline(transaction=True) as pipe:
+            pipe.hset(f"quiz:round:{round_id}", mapping={"answer": item.answer, "correct": 0, "wrong": 0})
+            pipe.expire(f"quiz:round:{round_id}", int(duration + self.grace))
+            await pipe.execute()
+        return round_id
+
+    async def answer(self, round_id, guild_id, user_id, choice):
+        status, answer, points, score, streak = await self._answer(
+            keys=[
+                f"quiz:round:{round_id}",
+                f"quiz:answered:{round_id}",
+                f"quiz:leaderboard:{guild_id}",
+                f"quiz:streaks:{guild_id}",
+                f"quiz:best_streak:{guild_id}",
+            ],
+            args=[user_id, choice, self.points, self.first_bonus],
+        )
+        return QuizResult(status, answer or None, int(points), int(float(score)), int(streak))
+
+    async def close(self, round_id):
+        answer, correct, wrong, first = await self._close(keys=[f"quiz:round:{round_id}"])
+        return RoundSummary(answer or None, int(correct), int(wrong), first or None)
+
+    async def standing(self, guild_id, user_id):
+        """(rank starting at 1 or None, points, best streak) for one user."""
+        async with self.r.pipeline(transaction=False) as pipe:
+            pipe.zrevrank(f"quiz:leaderboard:{guild_id}", user_id)
+            pipe.zscore(f"quiz:leaderboard:{guild_id}", user_id)
+            pipe.zscore(f"quiz:best_streak:{guild_id}", user_id)
+            rank, score, best = await pipe.execute()
+        return (rank + 1 if rank is not None else None), int(score or 0), int(best or 0)
+
+    async def leaderboard(self, guild_id, limit=10):
+        """Top `limit` (user id, points) pairs, best first."""
+        rows = await self.r.zrevrange(f"quiz:leaderboard:{guild_id}", 0, limit - 1, withscores=True)
+        return [(user_id, int(score)) for user_id, score in rows]
@@ -0,0 +1,204 @@
+# 📅 BeeBot reminders — due-time sorted set, local time parsing and lease-based claiming
+import re
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+Reminder = namedtuple("Reminder", "id user_id channel_id text due")
+
+# ⏳ Relative times: "10m", "in 2 hours", "1h30m", "a day and 3 hours"
+UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+DURATION_PART = re.compile(
+    r"((?<![\d.])\d+(?:\.\d+)?\s*|\ban?\s+)(s|secs?|seconds?|m|mins?|minutes?|h|hrs?|hours?|d|days?|w|wks?|weeks?)(?![a-z])"
+)
+FILLER = re.compile(r"\b(?:and|in|after|from now)\b|[,\s]+")
+
+# 🕘 Clock times: "9pm", "at 17:30", "tomorrow at 9", "noon"
+CLOCK = re.compile(r"^(?:(today|tomorrow)\s*)?(?:at\s+)?(?:(noon|midnight)|(\d{1,2})(?::(\d{2}))?\s*(am|pm)?)$")
+ISO_FORMATS = ("%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%Y-%m-%d")
+
+
+def _parse_duration(text):
+    total = 0.0
+    for amount, unit in DURATION_PART.findall(text):
+        amount = amount.strip()
+        value = 1.0 if amount in ("a", "an") else float(amount)
+        total += value * UNIT_SECONDS[unit[0] if unit[:2] != "wk" else "w"]
+    rest = FILLER.sub("", DURATION_PART.sub("", text))  # Anything left over means it wasn't just a duration
+    return total if total and not rest else None
+
+
+def _parse_clock(text, now):
+    match = CLOCK.match(text)
+    if not match:
+        return None
+    day, named, hour, minute, meridiem = match.groups()
+    if named:
+        hour, minute = (12, 0) if named == "noon" else (0, 0)
+    else:
+        hour, minute = int(hour), int(minute or 0)
+        if meridiem:
+            if not 1 <= hour <= 12:
+                return None
+            hour = hour % 12 + (12 if meridiem == "pm" else 0)
+    if hour > 23 or minute > 59:
+        return None
+
+    when = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if day == "tomorrow":
+        when += timedelta(days=1)
+    elif day is None and when <= now:
+        when += timedelta(days=1)  # "9am" said after 9am means tomorrow
+    return when
+
+
+def parse_when(text, now=None):
+    """Turn a user's time phrase into an aware UTC datetime, or None if it can't be understood.
+
+    Everything is parsed locally. Clock times and dates are read as UTC.
+    """
+    now = now or datetime.now(timezone.utc)
+    phrase = " ".join(text.lower().split())
+    if not phrase:
+        return None
+
+    seconds = _parse_duration(phrase)
+    if seconds:
+        try:
+            return now + timedelta(seconds=seconds)
+        except OverflowError:  # "in 999999999 weeks" runs past datetime.max
+            return None
+
+    when = _parse_clock(phrase, now)
+    if when:
+        return when
+
+    for fmt in ISO_FORMATS:
+        try:
+            return datetime.strptime(phrase.upper() if "T" in fmt else phrase, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+
+# 🐝 Atomically claim due reminders: first any whose lease expired (a replica died mid-delivery),
+# then newly due ones. Claimed ids move into the in-flight set with a lease, so no other
+# replica can pick them up until the lease runs out.
+#   KEYS: due zset, in-flight zset
+#   ARGV: now, batch size, lease expiry
+CLAIM_SCRIPT = """
+local batch = tonumber(ARGV[2])
+local ids = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1], 'LIMIT', 0, batch)
+if #ids < batch then
+    local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, batch - #ids)
+    if #due > 0 then
+        redis.call('ZREM', KEYS[1], unpack(due))
+        for _, id in ipairs(due) do
+            table.insert(ids, id)
+        end
+    end
+end
+for _, id in ipairs(ids) do
+    redis.call('ZADD', KEYS[2], ARGV[3], id)
+end
+return ids
+"""
+
+
+class ReminderStore:
+    """Reminders in Redis.
+
+    reminders:due        zset  id -> due timestamp (what the dispatcher polls)
+    reminders:inflight   zset  id -> lease expiry (claimed, not yet delivered)
+    reminders:user:{id}  zset  id -> due timestamp (for listing/deleting)
+    reminder:{id}        hash  user_id, channel_id, text, due, attempts
+    """
+
+    def __init__(self, r, lease_seconds=60, max_per_user=25, max_attempts=5):
+        self.r = r
+        self.lease_seconds = lease_seconds
+        self.max_per_user = max_per_user
+        self.max_attempts = max_attempts
+        self._claim = r.register_script(CLAIM_SCRIPT)
+
+    async def add(self, user_id, channel_id, text, due):
+        """Store a reminder; returns its id, or None if the user already has too many."""
+        if await self.r.zcard(f"reminders:user:{user_id}") >= self.max_per_user:
+            return None
+        reminder_id = str(await self.r.incr("reminders:next_id"))
+        score = due.timestamp()
+        async with self.r.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                f"reminder:{reminder_id}",
+                mapping={"user_id": user_id, "channel_id": channel_id or "", "text": text, "due": score},
+            )
+            pipe.zadd(f"reminders:user:{user_id}", {reminder_id: score})
+            pipe.zadd("reminders:due", {reminder_id: score})
+            await pipe.execute()
+        return reminder_id
+
+    async def list_for_user(self, user_id):
+        ids = await self.r.zrange(f"reminders:user:{user_id}", 0, -1)
+        if not ids:
+            return []
+        async with self.r.pipeline(transaction=False) as pipe:
+            for reminder_id in ids:
+                pipe.hgetall(f"reminder:{reminder_id}")
+            rows = await pipe.execute()
+        return [self._reminder(reminder_id, row) for reminder_id, row in zip(ids, rows) if row]
+
+    async def delete(self, user_id, reminder_id):
+        async with self.r.pipeline(transaction=True) as pipe:
+            pipe.zrem(f"reminders:user:{user_id}", reminder_id)
+            pipe.zrem("reminders:due", reminder_id)
+            pipe.zrem("reminders:inflight", reminder_id)
+            pipe.delete(f"reminder:{reminder_id}")
+            results = await pipe.execute()
+        return bool(results[-1])
+
+    async def claim_due(self, batch=200, now=None):
+        """Claim up to `batch` due reminders for delivery. Call `ack()` once each is sent."""
+        now = now or time.time()
+        ids = await self._claim(
+            keys=["reminders:due", "reminders:inflight"],
+            args=[now, batch, now + self.lease_seconds],
+        )
+        if not ids:
+            return []
+        async with self.r.pipeline(transaction=False) as pipe:
+            for reminder_id in ids:
+                pipe.hgetall(f"reminder:{reminder_id}")
+            rows = await pipe.execute()
+
+        reminders = []
+        orphans = []
+        for reminder_id, row in zip(ids, rows):
+            if row:
+                reminders.append(self._reminder(reminder_id, row))
+            else:
+                orphans.append(reminder_id)  # Deleted by its owner after being claimed
+        if orphans:
+            await self.r.zrem("reminders:inflight", *orphans)
+        return reminders
+
+    async def ack(self, reminder):
+        """Forget a delivered reminder."""
+        await self.delete(reminder.user_id, reminder.id)
+
+    async def failed(self, reminder):
+        """Count a failed delivery. True if it will be retried once its lease expires, False if dropped."""
+        attempts = await self.r.hincrby(f"reminder:{reminder.id}", "attempts", 1)
+        if attempts < self.max_attempts:
+            return True
+        await self.ack(reminder)
+        return False
+
+    @staticmethod
+    def _reminder(reminder_id, row):
+        return Reminder(
+            id=reminder_id,
+            user_id=row.get("user_id"),
+            channel_id=row.get("channel_id") or None,
+            text=row.get("text", ""),
+            due=datetime.fromtimestamp(float(row.get("due", 0)), timezone.utc),
+        )
@@ -0,0 +1,140 @@
+# 🛟 BeeBot resilience — deadlines, jittered retries, circuit breakers and a model cascade for OpenAI
+import asyncio
+import random
+import time
+
+import openai
+
+# Worth another try: rate limits, 5xx, dropped connections and timeouts (ours or the SDK's)
+RETRYABLE = (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError, asyncio.TimeoutError)
+
+
+class CircuitOpen(Exception):
+    """Every model's breaker is open; fail fast instead of queueing behind a sick upstream."""
+
+
+def retry_after(error):
+    """Seconds the server asked us to wait (`retry-after-ms` / `retry-after`), if it said."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        try:
+            return max(0.0, float(headers[header]) * scale)
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
+
+class CircuitBreaker:
+    """Opens after `threshold` failures in a row; after `reset_after` seconds lets one probe through."""
+
+    def __init__(self, threshold=5, reset_after=30.0):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_after else "open"
+
+    def allow(self):
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def release(self):
+        """The call ended without telling us anything about upstream health (cancelled, bad request...)."""
+        self._probing = False
+
+    def failure(self):
+        self.failures += 1
+        if self._probing or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+
+class ModelCascade:
+    """Runs `attempt(model)` under a deadline, retrying and falling back down a list of models.
+
+    Each try gets at most `timeout` seconds and the whole call `deadline`
+    seconds. Retryable failures back off exponentially with full jitter, or
+    as long as the server's Retry-After asks. A model whose breaker is open is
+    skipped; if every model is skipped, `CircuitOpen` is raised at once.
+    Other errors (bad request, auth) are raised as-is without a retry.
+    """
+
+    def __init__(self, models, timeout=30.0, deadline=60.0, max_retries=2, base_delay=0.5, max_delay=8.0,
+                 failure_threshold=5, reset_after=30.0):
+        self.models = list(models)
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.breakers = {}
+        self.stats = {"retries": 0, "failures": 0, "fallbacks": 0, "short_circuits": 0}
+
+    def breaker(self, model):
+        if model not in self.breakers:
+            self.breakers[model] = CircuitBreaker(self.failure_threshold, self.reset_after)
+        return self.breakers[model]
+
+    @property
+    def open_circuits(self):
+        return sum(breaker.state == "open" for breaker in self.breakers.values())
+
+    async def call(self, attempt, models=None):
+        started = time.monotonic()
+        last_error = None
+        for position, model in enumerate(models or self.models):
+            breaker = self.breaker(model)
+            if not breaker.allow():
+                continue
+            if position and last_error is not None:
+                self.stats["fallbacks"] += 1
+            for retry in range(self.max_retries + 1):
+                remaining = self.deadline - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise last_error or asyncio.TimeoutError()
+                try:
+                    result = await asyncio.wait_for(attempt(model), min(self.timeout, remaining))
+                except RETRYABLE as e:
+                    last_error = e
+                    self.stats["failures"] += 1
+                    breaker.failure()
+                    if retry == self.max_retries or breaker.state != "closed":
+                        break  # Out of tries, or this model just tripped: move down the cascade
+                    delay = retry_after(e)
+                    if delay is None:
+                        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+                    if delay >= self.deadline - (time.monotonic() - started):
+                        break
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(delay)
+                    continue
+                except BaseException:
+                    breaker.release()
+                    raise
+                breaker.success()
+                return result
+
+        if last_error is None:
+            self.stats["short_circuits"] += 1
+            raise CircuitOpen("OpenAI circuit open for " + ", ".join(models or self.models))
+        raise last_error
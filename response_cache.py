@@ -0,0 +1,97 @@
+# 💾 BeeBot response cache — reuse replies to repeated context-free questions
+import hashlib
+import time
+from collections import OrderedDict
+
+from moderation import normalize_text
+
+CACHE_PREFIX = "cache:reply"
+
+
+def normalize_prompt(prompt):
+    """Fold case, quotes, whitespace and trailing punctuation: "What do bees eat??" == "what do bees eat"."""
+    return normalize_text(prompt).rstrip(".!?,;: ")
+
+
+def cache_key(prompt, persona_digest, tone):
+    raw = f"{normalize_prompt(prompt)}\x1f{persona_digest}\x1f{tone}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier reply cache: a small in-process LRU in front of Redis.
+
+    Redis entries expire after `ttl` seconds; an access-time sorted set keeps
+    at most `max_entries` of them, evicting the least recently used.
+    """
+
+    def __init__(self, r, ttl=86400, max_entries=5000, l1_size=256, l1_ttl=300):
+        self.r = r
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.l1_size = l1_size
+        self.l1_ttl = l1_ttl
+        self._l1 = OrderedDict()  # key -> (expires_at, reply)
+        self.stats = {"l1_hits": 0, "redis_hits": 0, "misses": 0, "stores": 0}
+
+    @property
+    def hit_rate(self):
+        hits = self.stats["l1_hits"] + self.stats["redis_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    def _l1_get(self, key):
+        entry = self._l1.get(key)
+        if not entry:
+            return None
+        expires_at, reply = entry
+        if expires_at < time.monotonic():
+            del self._l1[key]
+            return None
+        self._l1.move_to_end(key)
+        return reply
+
+    def _l1_put(self, key, reply):
+        if self.l1_size <= 0:
+            return
+        self._l1[key] = (time.monotonic() + self.l1_ttl, reply)
+        self._l1.move_to_end(key)
+        while len(self._l1) > self.l1_size:
+            self._l1.popitem(last=False)
+
+    async def get(self, prompt, persona_digest, tone):
+        key = cache_key(prompt, persona_digest, tone)
+        reply = self._l1_get(key)
+        if reply is not None:
+            self.stats["l1_hits"] += 1
+            return reply
+
+        async with self.r.pipeline(transaction=False) as pipe:
+            pipe.get(f"{CACHE_PREFIX}:{key}")
+            pipe.zadd(f"{CACHE_PREFIX}:lru", {key: time.time()}, xx=True)  # Touch only if present
+            reply, _ = await pipe.execute()
+
+        if reply is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["redis_hits"] += 1
+        self._l1_put(key, reply)
+        return reply
+
+    async def put(self, prompt, persona_digest, tone, reply):
+        key = cache_key(prompt, persona_digest, tone)
+        self._l1_put(key, reply)
+        self.stats["stores"] += 1
+
+        async with self.r.pipeline(transaction=False) as pipe:
+            pipe.set(f"{CACHE_PREFIX}:{key}", reply, ex=self.ttl)
+            pipe.zadd(f"{CACHE_PREFIX}:lru", {key: time.time()})
+            pipe.zcard(f"{CACHE_PREFIX}:lru")
+            *_, size = await pipe.execute()
+
+        # 🧹 Evict the least recently used entries once over the size bound
+        overflow = size - self.max_entries
+        if overflow > 0:
+            evicted = await self.r.zpopmin(f"{CACHE_PREFIX}:lru", overflow)
+            if evicted:
+                await self.r.delete(*(f"{CACHE_PREFIX}:{member}" for member, _ in evicted))
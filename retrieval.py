@@ -0,0 +1,121 @@
+# 🔎 BeeBot retrieval — BM25 inverted index over facts, species and quiz content
+import math
+import re
+from collections import Counter, namedtuple
+
+Snippet = namedtuple("Snippet", "text answer source")  # `answer`: what BeeBot says when replying directly, or None
+Hit = namedtuple("Hit", "snippet score confidence covered")  # covered: every query term is in the snippet
+
+TERM = re.compile(r"[a-z0-9]{2,}")
+STOPWORDS = set(
+    "a an and are as at be by can do does for from has have how i in is it its me of on or so that "
+    "the their there they this to was what when where which who why will with you your beebot tell about".split()
+)
+QUESTION = re.compile(r"^\s*(?:how|what|why|when|where|which|who|do|does|did|is|are|can)\b|\?\s*$", re.IGNORECASE)
+
+
+def stem(term):
+    # Just enough to line up "wings"/"wing" and "flies"/"fly"
+    if len(term) > 4 and term.endswith("ies"):
+        return term[:-3] + "y"
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(term) > len(suffix) + 2 and term.endswith(suffix):
+            return term[:-len(suffix)]
+    return term
+
+
+def terms(text):
+    return [stem(term) for term in TERM.findall(text.lower()) if term not in STOPWORDS]
+
+
+def is_question(text):
+    return bool(QUESTION.search(text))
+
+
+class RetrievalIndex:
+    """BM25 over short snippets, via an inverted index so a query only touches documents sharing a term.
+
+    `confidence` is a hit's score divided by the best score the query could
+    get (every query term matched in a document of average length), so it is
+    comparable across queries.
+    """
+
+    def __init__(self, snippets, k1=1.2, b=0.75):
+        self.snippets = list(snippets)
+        self.k1 = k1
+        self.b = b
+        self.postings = {}  # term -> [(doc index, term frequency), ...]
+        self.lengths = []
+        self.vocabularies = []
+        for index, snippet in enumerate(self.snippets):
+            counts = Counter(terms(snippet.text))
+            self.vocabularies.append(set(counts))
+            self.lengths.append(sum(counts.values()))
+            for term, count in counts.items():
+                self.postings.setdefault(term, []).append((index, count))
+        self.average_length = sum(self.lengths) / max(1, len(self.lengths))
+        total = len(self.snippets)
+        self.idf = {
+            term: math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5)) for term, docs in self.postings.items()
+        }
+
+    def search(self, query, k=3):
+        query_terms = set(terms(query))
+        if not query_terms:
+            return []
+        scores = Counter()
+        for term in query_terms:
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for index, count in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[index] / self.average_length)
+                scores[index] += idf * count * (self.k1 + 1) / (count + norm)
+        if not scores:
+            return []
+        # Unknown terms count at the rarest idf, so a query about something we know nothing of stays unsure
+        rarest = max(self.idf.values())
+        ceiling = sum(self.idf.get(term, rarest) for term in query_terms)
+        return [
+            Hit(self.snippets[index], score, min(1.0, score / ceiling), query_terms <= self.vocabularies[index])
+            for index, score in scores.most_common(k)
+        ]
+
+
+def build_snippets(facts=(), species=(), quiz=()):
+    snippets = [Snippet(fact, fact, "facts") for fact in facts]
+    snippets += [Snippet(f"{name} (a bee species)", None, "species") for name in species]  # Names answer nothing
+    for item in quiz:
+        answer = dict(item.choices).get(item.answer, "")
+        snippets.append(Snippet(f"{item.question} {answer}", f"🐝 {item.question} **{answer}**!", "quiz"))
+    return snippets
+
+
+class KnowledgeBase:
+    """Keeps a RetrievalIndex in step with a ContentStore, rebuilding only after a corpus reloads."""
+
+    def __init__(self, content, facts="facts", species="bee_species", quiz="quiz"):
+        self.content = content
+        self.corpora = (facts, species, quiz)
+        self._sources = None
+        self._index = None
+
+    def index(self):
+        sources = tuple(self.content.get(name) for name in self.corpora)
+        if self._sources is None or any(new is not old for new, old in zip(sources, self._sources)):
+            self._index = RetrievalIndex(build_snippets(*sources))
+            self._sources = sources
+        return self._index
+
+    def search(self, query, k=3):
+        return self.index().search(query, k)
+
+
+def direct_answer(query, hits, confidence=0.75, margin=1.5):
+    """The stored answer when `query` is a question and its best hit is sure, clearly ahead and mentions
+    every term of the question (so "how many eyes does a human have?" never gets the bee answer), else None."""
+    if not hits or hits[0].snippet.answer is None or not hits[0].covered or not is_question(query):
+        return None
+    if hits[0].confidence < confidence or (len(hits) > 1 and hits[0].score < margin * hits[1].score):
+        return None
+    return hits[0].snippet.answer
@@ -0,0 +1,113 @@
+# ⚙️ BeeBot settings cache — rarely-changing keys (consent, autoreply, serious mode, channels) kept in memory
+import asyncio
+import time
+from collections import OrderedDict
+
+import redis.asyncio as aioredis
+
+
+class SettingsCache:
+    """In-process cache of string settings, kept consistent across replicas with pub/sub.
+
+    Writes go through `set()`/`delete()`, which publish the key on `channel`;
+    every replica running `listen()` drops its copy when it hears about it.
+    Entries also expire after `ttl` seconds in case a message is missed, and
+    while the subscription is down nothing is cached at all. Callables in
+    `watchers` hear each key from the feed, and None after a resubscribe.
+    """
+
+    def __init__(self, r, channel="settings:invalidate", max_entries=50000, ttl=300, on_error=None):
+        self.r = r
+        self.channel = channel
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.on_error = on_error
+        self.listening = False
+        self.stats = {"hits": 0, "misses": 0}
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._generation = 0  # Bumped on every invalidation so a racing read can't cache a stale value
+        self.watchers = []
+
+    async def get(self, key):
+        return (await self.get_many([key]))[0]
+
+    async def get_many(self, keys):
+        now = time.monotonic()
+        values = {}
+        missing = []
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry and entry[1] > now:
+                self._entries.move_to_end(key)
+                values[key] = entry[0]
+            elif key not in missing:
+                missing.append(key)
+        self.stats["hits"] += len(keys) - len(missing)
+        self.stats["misses"] += len(missing)
+
+        if missing:
+            generation = self._generation
+            fetched = await self.r.mget(missing)
+            values.update(zip(missing, fetched))
+            if self.listening and generation == self._generation:
+                for key, value in zip(missing, fetched):
+                    self._remember(key, value, now)
+        return [values[key] for key in keys]
+
+    async def set(self, key, value):
+        await self.r.set(key, value)
+        await self._publish(key)
+
+    async def delete(self, key):
+        await self.r.delete(key)
+        await self._publish(key)
+
+    def invalidate(self, key=None):
+        self._generation += 1
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    async def listen(self):
+        """Follow invalidations forever, resubscribing (with an empty cache) after connection trouble."""
+        subscribed_before = False
+        while True:
+            pubsub = self.r.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                self.invalidate()  # Anything cached before now may have missed a message
+                self.listening = True
+                if subscribed_before:
+                    self._notify(None)
+                subscribed_before = True
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.invalidate(message["data"])
+                        self._notify(message["data"])
+            except (aioredis.RedisError, OSError) as e:
+                if self.on_error:
+                    self.on_error(e)
+            finally:
+                self.listening = False
+                self.invalidate()
+                await pubsub.aclose()
+            await asyncio.sleep(1)
+
+    def _notify(self, key):
+        for watcher in self.watchers:
+            watcher(key)
+
+    async def changed(self, key):
+        """Announce a change made outside `set()`/`delete()` (say, to a hash) to every replica's watchers."""
+        await self._publish(key)
+
+    async def _publish(self, key):
+        self.invalidate(key)
+        await self.r.publish(self.channel, key)
+
+    def _remember(self, key, value, now):
+        self._entries[key] = (value, now + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,80 @@
+# 🧩 BeeBot sharding — shard ranges from the environment, per-shard health and a leader lease
+import json
+import time
+
+
+def parse_shard_ids(text):
+    """'0-3,8' -> [0, 1, 2, 3, 8]; blank -> None (let discord.py pick every shard)."""
+    if not text or not text.strip():
+        return None
+    shard_ids = set()
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = (int(bound) for bound in part.split("-", 1))
+            if last < first:
+                raise ValueError(f"Bad shard range: {part!r}")
+            shard_ids.update(range(first, last + 1))
+        else:
+            shard_ids.add(int(part))
+    return sorted(shard_ids)
+
+
+# 🐝 Take the lease if it's free, or extend it if we already hold it.
+#   KEYS: lease key
+#   ARGV: owner, ttl ms
+LEASE_SCRIPT = """
+local holder = redis.call('GET', KEYS[1])
+if holder == false or holder == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+
+class LeaderLease:
+    """One holder at a time across every process sharing Redis.
+
+    The holder renews on each `acquire()`; if it dies, the lease expires after
+    `ttl` seconds and another process takes over.
+    """
+
+    def __init__(self, r, key, owner, ttl=30):
+        self.r = r
+        self.key = key
+        self.owner = owner
+        self.ttl = ttl
+        self.held = False
+        self._lease = r.register_script(LEASE_SCRIPT)
+
+    async def acquire(self):
+        self.held = bool(await self._lease(keys=[self.key], args=[self.owner, int(self.ttl * 1000)]))
+        return self.held
+
+
+class ShardHealth:
+    """Per-shard heartbeats in Redis (`shard:health:{id}`), expiring when a shard stops reporting."""
+
+    def __init__(self, r, cluster, ttl=90):
+        self.r = r
+        self.cluster = cluster
+        self.ttl = ttl
+
+    async def report(self, shards):
+        """`shards`: shard id -> dict of status fields (latency, guilds, ready, ...)."""
+        now = time.time()
+        async with self.r.pipeline(transaction=False) as pipe:
+            for shard_id, status in shards.items():
+                entry = dict(status, cluster=self.cluster, ts=now)
+                pipe.set(f"shard:health:{shard_id}", json.dumps(entry), ex=self.ttl)
+            await pipe.execute()
+
+    async def read(self, shard_count):
+        """Shard id -> last reported status, or None for shards that have gone quiet."""
+        if not shard_count:
+            return {}
+        raw = await self.r.mget([f"shard:health:{shard_id}" for shard_id in range(shard_count)])
+        return {shard_id: json.loads(entry) if entry else None for shard_id, entry in enumerate(raw)}
@@ -0,0 +1,155 @@
+# 🍯 BeeBot storage — async Redis layer with a pooled connection
+import time
+from collections import namedtuple
+
+import redis.asyncio as aioredis
+
+# 📦 Everything on_message and ai_response need about one incoming message
+MessageSnapshot = namedtuple("MessageSnapshot", "consent autoreply context emotion serious_mode summary")
+
+# 🧠 One round trip per message: read consent/autoreply/serious mode and, only if the
+# user has consented, record the message + emotion and return the refreshed context.
+# Serious mode is per guild, falling back to the old global switch.
+#   KEYS: consent, context, emotion, autoreply, serious_mode (guild), summary, serious_mode (global)
+#   ARGV: encoded turn, context limit, ttl seconds, emotion
+MESSAGE_SCRIPT = """
+local consent = redis.call('GET', KEYS[1])
+local autoreply = redis.call('GET', KEYS[4])
+local serious = redis.call('GET', KEYS[5]) or redis.call('GET', KEYS[7])
+if consent ~= 'on' then
+    return {consent, autoreply, {}, false, serious, false}
+end
+redis.call('LPUSH', KEYS[2], ARGV[1])
+redis.call('LTRIM', KEYS[2], 0, tonumber(ARGV[2]) - 1)
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+redis.call('SET', KEYS[3], ARGV[4], 'EX', ARGV[3])
+redis.call('EXPIRE', KEYS[6], ARGV[3])
+return {consent, autoreply, redis.call('LRANGE', KEYS[2], 0, -1), ARGV[4], serious, redis.call('GET', KEYS[6])}
+"""
+
+
+def create_redis(host="localhost", port=6379, db=0, password=None, max_connections=32):
+    """Build an asyncio Redis client backed by a bounded connection pool.
+
+    Callers beyond `max_connections` wait for a free connection instead of failing.
+    """
+    pool = aioredis.BlockingConnectionPool(
+        host=host,
+        port=port,
+        db=db,
+        password=password,
+        decode_responses=True,
+        max_connections=max_connections,
+        timeout=10,
+    )
+    return aioredis.Redis(connection_pool=pool)
+
+
+def serious_mode_key(guild_id=None):
+    """Serious mode lives per guild so every shard/process reads the same switch for its guilds."""
+    return f"serious_mode:{guild_id}" if guild_id else "serious_mode"
+
+
+async def backfill_index(r, index, pattern, write, chunk=1000):
+    """Build `index` once from the keys matching `pattern`: `write(keys, values)` gets them `chunk` at a time.
+
+    `{index}:built` is set only after the last chunk, so an interrupted scan starts over next time.
+    """
+    if await r.exists(f"{index}:built"):
+        return
+    keys = [key async for key in r.scan_iter(match=pattern, count=5000)]
+    for start in range(0, len(keys), chunk):
+        batch = keys[start:start + chunk]
+        await write(batch, await r.mget(batch))
+    await r.set(f"{index}:built", 1)
+
+
+def _text(value):
+    # Lua `false` comes back as None; keep strings as-is
+    return value if value else None
+
+
+class HiveStore:
+    """Async access to BeeBot's per-user context, emotion and consent keys."""
+
+    def __init__(self, r, context_limit=40, context_ttl=3600):
+        self.r = r
+        self.context_limit = context_limit
+        self.context_ttl = context_ttl
+        self._message_script = r.register_script(MESSAGE_SCRIPT)
+
+    async def record_message(self, user_id, thread_id, channel_id, entry, emotion, guild_id=None):
+        """Consent-gated store of one encoded turn, returning a `MessageSnapshot` in a single round trip."""
+        consent, autoreply, context, stored_emotion, serious, summary = await self._message_script(
+            keys=[
+                f"consent:{user_id}",
+                f"context:{thread_id}:{user_id}",
+                f"emotion:{thread_id}:{user_id}",
+                f"autoreply:{channel_id}",
+                serious_mode_key(guild_id),
+                f"summary:{thread_id}:{user_id}",
+                serious_mode_key(),
+            ],
+            args=[entry, self.context_limit, self.context_ttl, emotion],
+        )
+        return MessageSnapshot(
+            consent=consent == "on",
+            autoreply=_text(autoreply),
+            context=list(context or []),
+            emotion=_text(stored_emotion) or "neutral",
+            serious_mode=serious == "on",
+            summary=_text(summary),
+        )
+
+    async def record_reply(self, user_id, thread_id, entry):
+        """Append BeeBot's own (encoded) reply to the conversation."""
+        key = f"context:{thread_id}:{user_id}"
+        async with self.r.pipeline(transaction=False) as pipe:
+            pipe.lpush(key, entry)
+            pipe.ltrim(key, 0, self.context_limit - 1)
+            pipe.expire(key, self.context_ttl)
+            await pipe.execute()
+
+    async def get_turns_and_summary(self, user_id, thread_id):
+        async with self.r.pipeline(transaction=False) as pipe:
+            pipe.lrange(f"context:{thread_id}:{user_id}", 0, -1)
+            pipe.get(f"summary:{thread_id}:{user_id}")
+            return tuple(await pipe.execute())
+
+    async def fold_summary(self, user_id, thread_id, summary, folded):
+        """Save a new rolling summary and drop the `folded` oldest turns it now covers."""
+        async with self.r.pipeline(transaction=True) as pipe:
+            pipe.set(f"summary:{thread_id}:{user_id}", summary, ex=self.context_ttl)
+            pipe.ltrim(f"context:{thread_id}:{user_id}", 0, -(folded + 1))
+            await pipe.execute()
+
+    async def get_conversation(self, user_id, thread_id):
+        """Context, emotion and rolling summary for one user in one thread."""
+        async with self.r.pipeline(transaction=False) as pipe:
+            pipe.lrange(f"context:{thread_id}:{user_id}", 0, -1)
+            pipe.get(f"emotion:{thread_id}:{user_id}")
+            pipe.get(f"summary:{thread_id}:{user_id}")
+            context, emotion, summary = await pipe.execute()
+        return context, emotion or "neutral", summary
+
+    async def clear_context(self, user_id, thread_id):
+        await self.r.delete(
+            f"context:{thread_id}:{user_id}",
+            f"emotion:{thread_id}:{user_id}",
+            f"summary:{thread_id}:{user_id}",
+        )
+
+    async def add_token_usage(self, guild_id, prompt, cached, completion, ttl=40 * 86400):
+        """Add one OpenAI call's tokens to today's (UTC) per-guild tally: hash `tokens:{day}:{guild}`."""
+        key = f"tokens:{time.strftime('%Y-%m-%d', time.gmtime())}:{guild_id or 'dm'}"
+        async with self.r.pipeline(transaction=False) as pipe:
+            pipe.hincrby(key, "prompt", prompt)
+            pipe.hincrby(key, "cached", cached)
+            pipe.hincrby(key, "completion", completion)
+            pipe.expire(key, ttl)
+            await pipe.execute()
+
+    async def token_usage(self, guild_id, day=None):
+        day = day or time.strftime("%Y-%m-%d", time.gmtime())
+        usage = await self.r.hgetall(f"tokens:{day}:{guild_id or 'dm'}")
+        return {field: int(usage.get(field, 0)) for field in ("prompt", "cached", "completion")}
@@ -0,0 +1,92 @@
+# ✍️ BeeBot streaming replies — show tokens as they arrive without tripping Discord's edit limits
+import asyncio
+import time
+
+DISCORD_MESSAGE_LIMIT = 2000
+PLACEHOLDER = "🐝 *buzzing…*"
+TYPING_CURSOR = " ▌"
+
+
+def split_message(text, limit=DISCORD_MESSAGE_LIMIT):
+    """Split text into Discord-sized chunks, preferring line breaks, then spaces."""
+    chunks = []
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit)
+        if cut <= 0:
+            cut = text.rfind(" ", 0, limit)
+        if cut <= 0:
+            cut = limit
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip("\n ")
+    chunks.append(text)
+    return chunks
+
+
+class StreamingReply:
+    """Posts a placeholder right away, then edits it as the reply grows.
+
+    `send(content)` must return a message with an async `edit(content=...)`
+    (a channel message or an interaction followup). Updates are coalesced so
+    at most one edit is in flight and edits are at least `interval` seconds
+    apart — Discord allows roughly five edits per five seconds per channel.
+    """
+
+    def __init__(self, send, interval=1.2, limit=DISCORD_MESSAGE_LIMIT):
+        self.send = send
+        self.interval = interval
+        self.limit = limit
+        self.message = None
+        self._pending = None
+        self._shown = None
+        self._last_edit = 0.0
+        self._flusher = None
+
+    async def begin(self, placeholder=PLACEHOLDER):
+        self.message = await self.send(placeholder)
+        self._shown = placeholder
+        self._last_edit = time.monotonic()
+
+    def update(self, text):
+        """Record the latest partial text; an edit is scheduled if none is waiting."""
+        if self.message is None or not text:
+            return
+        self._pending = text
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush())
+
+    async def _flush(self):
+        # Keep going until no newer text arrived while we were waiting or editing
+        while self._pending is not None:
+            delay = self.interval - (time.monotonic() - self._last_edit)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            text, self._pending = self._pending, None
+            preview = text[: self.limit - len(TYPING_CURSOR)] + TYPING_CURSOR
+            if preview == self._shown:
+                continue
+            try:
+                await self._edit(preview)
+            except Exception:
+                return  # A failed preview edit isn't fatal; finish() still posts the full reply
+
+    async def _edit(self, content):
+        self._last_edit = time.monotonic()
+        self._shown = content
+        await self.message.edit(content=content)
+
+    async def finish(self, text):
+        """Show the final reply, spilling anything over the length limit into extra messages."""
+        if self._flusher and not self._flusher.done():
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except (asyncio.CancelledError, Exception):
+                pass
+
+        first, *rest = split_message(text, self.limit)
+        if self.message is None:
+            self.message = await self.send(first)
+        elif first != self._shown:
+            await self._edit(first)
+        for chunk in rest:
+            await self.send(chunk)
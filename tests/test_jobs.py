@@ -0,0 +1,78 @@
+# 📬 JobQueue against fakeredis: enqueue, claim, ack, retry/dead-letter and reclaiming abandoned jobs
+import asyncio
+import os
+import sys
+
+import fakeredis  # From requirements-dev.txt, with lupa for the Lua scripts
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from jobs import JobQueue  # noqa: E402
+
+
+def run(test):
+    async def main():
+        queue = JobQueue(fakeredis.FakeAsyncRedis(decode_responses=True), max_attempts=2, claim_idle=60)
+        await queue.ensure_group()
+        await test(queue)
+    asyncio.run(main())
+
+
+def test_enqueue_and_claim_round_trips_fields():
+    async def test(queue):
+        await queue.enqueue(kind="ask", prompt="how many wings?", guild_id=None, created=1.5)
+        [job] = await queue.claim("worker-1", block=0.01)
+        assert job.fields == {"kind": "ask", "prompt": "how many wings?", "guild_id": None, "created": 1.5}
+        assert job.attempts == 0
+        assert await queue.claim("worker-2", block=0.01) == []  # Each job goes to one consumer only
+    run(test)
+
+
+def test_ensure_group_is_idempotent():
+    async def test(queue):
+        await queue.ensure_group()
+    run(test)
+
+
+def test_ack_removes_the_job():
+    async def test(queue):
+        await queue.enqueue(kind="reply")
+        [job] = await queue.claim("worker-1", block=0.01)
+        assert await queue.backlog() == 1
+        await queue.ack(job)
+        assert await queue.backlog() == 0
+        assert await queue.r.xpending(queue.stream, queue.group) == {
+            "pending": 0, "min": None, "max": None, "consumers": []
+        }
+    run(test)
+
+
+def test_retry_requeues_then_dead_letters():
+    async def test(queue):
+        await queue.enqueue(kind="reply", prompt="hi")
+        [job] = await queue.claim("worker-1", block=0.01)
+        assert await queue.retry(job, RuntimeError("boom")) is True
+
+        [again] = await queue.claim("worker-1", block=0.01)
+        assert again.attempts == 1 and again.fields == job.fields
+        assert await queue.retry(again, RuntimeError("boom again")) is False  # max_attempts=2
+
+        assert await queue.backlog() == 0
+        [(_, dead)] = await queue.r.xrange(f"{queue.stream}:dead")
+        assert dead["attempts"] == "2" and dead["error"] == "boom again"
+    run(test)
+
+
+def test_abandoned_jobs_are_reclaimed_after_claim_idle():
+    async def test(queue):
+        await queue.enqueue(kind="reply", prompt="lost")
+        [job] = await queue.claim("dead-worker", block=0.01)
+
+        assert await queue.claim("worker-2", block=0.01) == []  # Not idle long enough yet
+        queue.claim_idle = 0
+        [reclaimed] = await queue.claim("worker-2", block=0.01)
+        assert reclaimed.id == job.id and reclaimed.fields == job.fields
+
+        await queue.ack(reclaimed)
+        assert await queue.backlog() == 0
+    run(test)
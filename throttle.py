@@ -0,0 +1,102 @@
+# 🚦 BeeBot throttling — Redis token buckets and burst coalescing for auto-replies
+import asyncio
+import time
+from collections import namedtuple
+
+RateDecision = namedtuple("RateDecision", "allowed scope retry_after")
+
+# 🪣 Check every bucket, and only if all have a token, take one from each (atomic)
+#   KEYS: bucket keys
+#   ARGV: now (ms), then capacity and refill-per-ms for each key in order
+TOKEN_BUCKET_SCRIPT = """
+local now = tonumber(ARGV[1])
+local levels = {}
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[2 * i])
+    local rate = tonumber(ARGV[2 * i + 1])
+    local bucket = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    if tokens < 1 then
+        return {i, math.ceil((1 - tokens) / rate)}
+    end
+    levels[i] = tokens
+end
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[2 * i])
+    local rate = tonumber(ARGV[2 * i + 1])
+    redis.call('HSET', KEYS[i], 'tokens', levels[i] - 1, 'ts', now)
+    redis.call('PEXPIRE', KEYS[i], math.ceil(capacity / rate))
+end
+return {0, 0}
+"""
+
+
+def parse_rate(spec):
+    """Parse "5/60" into (capacity 5, period 60 seconds)."""
+    count, _, period = spec.partition("/")
+    return int(count), float(period or 60)
+
+
+class RateLimiter:
+    """Token buckets per scope (e.g. user, channel, guild), all checked in one script call."""
+
+    def __init__(self, r, limits, prefix="ratelimit"):
+        self.limits = limits  # scope -> (capacity, period seconds)
+        self.prefix = prefix
+        self._script = r.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def hit(self, **ids):
+        """Spend one token from each scope's bucket, e.g. `hit(user=1, guild=2)`.
+
+        Scopes whose id is None or that have no configured limit are skipped.
+        """
+        scopes = [scope for scope, value in ids.items() if value is not None and scope in self.limits]
+        if not scopes:
+            return RateDecision(True, None, 0.0)
+
+        keys, args = [], [int(time.time() * 1000)]
+        for scope in scopes:
+            capacity, period = self.limits[scope]
+            keys.append(f"{self.prefix}:{scope}:{ids[scope]}")
+            args += [capacity, capacity / (period * 1000)]
+
+        index, retry_ms = await self._script(keys=keys, args=args)
+        if index == 0:
+            return RateDecision(True, None, 0.0)
+        return RateDecision(False, scopes[index - 1], retry_ms / 1000)
+
+
+class MessageCoalescer:
+    """Collects quick bursts of messages per key and hands them over as one batch.
+
+    Each new message restarts a `window`-second timer; a burst is flushed when
+    the timer runs out, or after `max_wait` seconds at most so a steady
+    stream can't postpone a reply forever.
+    """
+
+    def __init__(self, handler, window=2.0, max_wait=8.0, on_error=None):
+        self.handler = handler  # async handler(key, items)
+        self.window = window
+        self.max_wait = max_wait
+        self.on_error = on_error
+        self._batches = {}  # key -> (first seen, items, timer task)
+
+    def add(self, key, item):
+        now = time.monotonic()
+        first, items, timer = self._batches.get(key, (now, [], None))
+        if timer:
+            timer.cancel()
+        items.append(item)
+        delay = max(0.0, min(self.window, first + self.max_wait - now))
+        self._batches[key] = (first, items, asyncio.create_task(self._flush_later(key, delay)))
+
+    async def _flush_later(self, key, delay):
+        await asyncio.sleep(delay)
+        _, items, _ = self._batches.pop(key)
+        try:
+            await self.handler(key, items)
+        except Exception as e:
+            if self.on_error:
+                self.on_error(key, e)
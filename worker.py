@@ -0,0 +1,101 @@
+# 🐝 BeeBot AI worker — answers queued replies over Discord's REST API, no gateway connection.
+# Run any number of these next to `bot.py` (started with AI_WORKERS=on): python worker.py
+import asyncio
+import functools
+import os
+import socket
+import time
+
+import discord
+import redis
+
+from bot import (
+    AI_MAX_CONCURRENCY,
+    DISCORD_TOKEN,
+    METRICS_HOST,
+    job_queue,
+    load_persona_overrides,
+    log,
+    metrics,
+    r,
+    send_ai_reply,
+    settings,
+)
+
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", AI_MAX_CONCURRENCY * 2))
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", 0))
+INTERACTION_TTL = 14 * 60  # Interaction tokens expire after 15 minutes
+
+# 🌐 REST-only client: login() sets up HTTP auth, but we never connect to the gateway
+rest = discord.Client(intents=discord.Intents(guilds=True))
+
+
+async def handle(job):
+    fields = job.fields
+    age = time.time() - fields.get("created", time.time())
+    metrics.observe("stage_seconds", age, stage="job_wait")
+    try:
+        if fields["kind"] == "ask":
+            if age > INTERACTION_TTL:
+                log.warning("Dropping /ask job %s: its interaction expired %.0fs ago", job.id, age - INTERACTION_TTL)
+                await job_queue.ack(job)
+                return
+            webhook = discord.Webhook.partial(fields["application_id"], fields["token"], client=rest)
+            send = functools.partial(webhook.send, wait=True)
+            await send_ai_reply(send, fields["prompt"], guild_id=fields.get("guild_id"))
+        else:
+            send = rest.get_partial_messageable(int(fields["channel_id"])).send
+            await send_ai_reply(
+                send,
+                fields["prompt"],
+                user_id=fields["user_id"],
+                channel_id=fields["thread_id"],
+                guild_id=fields.get("guild_id")
+            )
+    except (discord.Forbidden, discord.NotFound) as e:
+        log.warning("Dropping job %s: %s", job.id, e)
+    except Exception as e:
+        requeued = await job_queue.retry(job, e)
+        log.warning("Job %s failed (attempt %d): %s%s", job.id, job.attempts + 1, e, "" if requeued else "; gave up")
+        metrics.inc("jobs_total", outcome="retried" if requeued else "dead")
+        return
+    await job_queue.ack(job)
+    metrics.inc("jobs_total", outcome="done")
+
+
+async def main():
+    await r.ping()
+    await rest.login(DISCORD_TOKEN)
+    await job_queue.ensure_group()
+    # setup_hook never runs here: load /persona overrides ourselves and follow the settings feed for changes
+    log.info("Loaded %d guild persona override(s)", await load_persona_overrides())
+    settings_listener = asyncio.create_task(settings.listen())
+    if WORKER_METRICS_PORT:
+        await metrics.serve(METRICS_HOST, WORKER_METRICS_PORT)
+    consumer = f"{socket.gethostname()}:{os.getpid()}"
+    log.info("Worker %s is buzzing (up to %d jobs at once)", consumer, WORKER_CONCURRENCY)
+
+    running = set()
+    try:
+        while True:
+            free = WORKER_CONCURRENCY - len(running)
+            if not free:
+                await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                continue
+            try:
+                jobs = await job_queue.claim(consumer, count=free)
+            except redis.RedisError as e:
+                log.warning("Couldn't read jobs: %s", e)
+                await asyncio.sleep(1)
+                continue
+            for job in jobs:
+                task = asyncio.create_task(handle(job))
+                running.add(task)
+                task.add_done_callback(running.discard)
+    finally:
+        settings_listener.cancel()
+        await rest.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())